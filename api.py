@@ -0,0 +1,73 @@
+import importlib
+
+# generator classes by language and module, as "module:class" so that they are only imported when used,
+# keys are upper case, add more by `register`
+support = {
+    'PYTHON3': {
+        'PYQT5': 'generator:PyQt5Generator',
+        'PYSIDE2': 'generator:PySide2Generator',
+    },
+}
+
+
+def register(language: str, module: str, path: str):
+    """
+    register a generator class
+
+    :param path: "module:class" of the generator class, imported when it is used
+    """
+    support.setdefault(language.upper(), {})[module.upper()] = path
+
+
+def get_generator_class(language: str, module: str) -> type:
+    """
+    get generator class (subclass of `BaseGenerator`) of `language` and `module`, case insensitive,
+    importing it on first use
+    """
+    language = language.upper()
+    module = module.upper()
+    if language not in support:
+        raise ValueError(f'language "{language}" not supported')
+    if module not in support[language]:
+        raise ValueError(f'language "{language}" not supported by module "{module}"')
+    module_name, class_name = support[language][module].split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# last (text, code) of `generate_code` for each set of other args, at most `MAX_LAST_RESULTS` of them, so that
+# memory doesn't grow with the number of distinct texts (e.g. each typing pause of an editor)
+MAX_LAST_RESULTS = 16
+_last_results = {}
+
+
+def generate_code(text: str, language: str = 'Python3', module: str = 'PyQt5', data_name: str = 'ConfigData',
+                  window_name: str = 'ConfigWindow', parser: str = 'fast', style: str = 'classic',
+                  pages: str = '', hot_reload: bool = False) -> str:
+    """
+    generate code from spec text and return it, without touching any file
+
+    Result of the last call with the same other args is kept, so that calling again with the same spec
+    (e.g. editor preview) is free.
+
+    :param text: spec text (*.html)
+    :param language: language of code
+    :param module: module name of GUI software
+    :param data_name: class name of ConfigData
+    :param window_name: class name of ConfigWindow
+    :param parser: spec parser, 'fast' or 'bs4'
+    :param style: style of generated code, 'classic' or 'compact', see `BaseGenerator.STYLES`
+    :param pages: 'tabs' or 'sections' to show fieldsets as pages, see `PyQt5Generator.PAGES`, empty for group boxes
+    :param hot_reload: watch the config file in ConfigWindow, and reload it when changed by other programs
+    """
+    options = (language, module, data_name, window_name, parser, style, pages, hot_reload)
+    last = _last_results.get(options)
+    if last is not None and last[0] == text:
+        return last[1]
+    generator = get_generator_class(language, module)(None, None, data_name, window_name, parser, style=style,
+                                                           pages=pages or None, hot_reload=hot_reload)
+    code = generator.generate_code(text)
+    # single dict operations are atomic, so that it is safe in threads of the server
+    if options not in _last_results and len(_last_results) >= MAX_LAST_RESULTS:
+        _last_results.clear()
+    _last_results[options] = (text, code)
+    return code
@@ -0,0 +1,259 @@
+import glob
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from cache import BuildCache, get_key
+from generator import BaseGenerator
+
+
+MODULE_PLACEHOLDER = '{module}'  # replaced by module name in output paths, to generate for several modules
+
+
+class Job(NamedTuple):
+    """
+    one input -> output pair to generate, with module name of GUI software as given in args
+    """
+    input_file: str
+    output_file: str
+    module: str
+
+
+class Result(NamedTuple):
+    """
+    result of one job, `error` is None if it succeeded, `skipped` is True if its output was up to date,
+    `timings` are durations of phases if it was generated, see `BaseGenerator.phase`,
+    `unchanged` is True if it was generated but its output file already had the same content and was not written
+    """
+    job: Job
+    error: Optional[str]
+    skipped: bool = False
+    timings: Optional[Dict[str, float]] = None
+    unchanged: bool = False
+
+
+def is_batch(inputs: List[str], manifest: Optional[str]) -> bool:
+    """
+    whether the args describe more than a single `-i`/`-o` pair
+    """
+    if manifest or len(inputs) > 1:
+        return True
+    return os.path.isdir(inputs[0]) or glob.has_magic(inputs[0])
+
+
+def collect_jobs(inputs: List[str], output: Optional[str], manifest: Optional[str],
+                 modules: Sequence[str]) -> List[Job]:
+    """
+    collect jobs from input files, directories, globs and a manifest, one job per input and module
+
+    :param inputs: input file paths, directories (searched recursively for *.html) or glob patterns
+    :param output: output directory in batch mode, output file path otherwise
+    :param manifest: path of a json file like {"input.html": "output.py", ...}, relative to itself
+    :param modules: module names of GUI software, `MODULE_PLACEHOLDER` in output paths is replaced by each of them
+    """
+    pairs = []
+    if manifest:
+        pairs.extend(read_manifest(manifest))
+    if inputs and not is_batch(inputs, None):
+        pairs.append((os.path.abspath(inputs[0]), os.path.abspath(output)))
+    elif inputs:
+        output = os.path.abspath(output)
+        for pattern in inputs:
+            if os.path.isdir(pattern):
+                # keep the directory structure below the input directory
+                for input_file in sorted(glob.glob(os.path.join(pattern, '**', '*.html'), recursive=True)):
+                    name = os.path.splitext(os.path.relpath(input_file, pattern))[0] + '.py'
+                    pairs.append((os.path.abspath(input_file), os.path.join(output, name)))
+            else:
+                input_files = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+                for input_file in input_files:
+                    name = os.path.splitext(os.path.basename(input_file))[0] + '.py'
+                    pairs.append((os.path.abspath(input_file), os.path.join(output, name)))
+    return [
+        Job(input_file, output_file.replace(MODULE_PLACEHOLDER, module), module)
+        for input_file, output_file in pairs for module in modules
+    ]
+
+
+def read_manifest(manifest: str) -> List[Tuple[str, str]]:
+    """
+    read (input, output) paths from a manifest file like {"input.html": "output.py", ...}
+    """
+    with open(manifest, 'r', encoding='utf-8') as f:
+        pairs = json.load(f)
+    if not isinstance(pairs, dict):
+        raise ValueError(f'manifest "{manifest}" must be a json object of input -> output paths')
+    base = os.path.dirname(os.path.abspath(manifest))
+    return [
+        (os.path.abspath(os.path.join(base, input_file)), os.path.abspath(os.path.join(base, output_file)))
+        for input_file, output_file in pairs.items()
+    ]
+
+
+def check_job(job: Job, force: bool, make_dirs: bool = False) -> Optional[str]:
+    """
+    check paths of a job and return error message, or None if it is fine
+
+    :param make_dirs: create missing output directories instead of reporting them
+    """
+    if not os.path.exists(job.input_file):
+        return f'input file "{job.input_file}" not found'
+    output_dir = os.path.dirname(job.output_file)
+    if not os.path.exists(output_dir):
+        if not make_dirs:
+            return f'output file directory "{output_dir}" not found'
+        os.makedirs(output_dir, exist_ok=True)
+    if os.path.exists(job.output_file) and not force:
+        return f'output file "{job.output_file}" already exists'
+    return None
+
+
+class GeneratorFactory:
+    """
+    function creating the generator of a job by its module, picklable so that it can be sent to worker processes
+    """
+    def __init__(self, classes: Dict[str, type], **options):
+        """
+        :param classes: module name as in `Job.module` -> generator class
+        :param options: other arguments of generator classes, e.g. data_name, window_name, parser
+        """
+        self.classes = classes
+        self.options = options
+
+    def __call__(self, job: Job) -> BaseGenerator:
+        return self.classes[job.module](job.input_file, job.output_file, **self.options)
+
+
+def run_group(jobs: List[Job], create_generator: Callable[[Job], BaseGenerator], force: bool,
+              make_dirs: bool = False) -> List[Result]:
+    """
+    check and generate jobs of the same input file, which is parsed only once and shared by all generators
+    unless they stream, never raises so that it is safe to run in a worker process
+
+    :param create_generator: function creating a generator of a job, e.g. `GeneratorFactory`,
+                             must be picklable to run in worker processes
+    """
+    results = []
+    spec = None
+    for job in jobs:
+        timings = None
+        unchanged = False
+        try:
+            error = check_job(job, force, make_dirs)
+            if error is None:
+                generator = create_generator(job)
+                # a streaming generator parses the input file by itself instead of loading the whole spec
+                if spec is None and not generator.stream:
+                    spec = generator.load_spec()
+                generator.generate(spec)
+                timings = generator.timings
+                unchanged = not generator.written
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        results.append(Result(job, error, False, timings, unchanged))
+    return results
+
+
+def run_jobs(jobs: List[Job], create_generator: Callable[[Job], BaseGenerator], force: bool,
+             workers: Optional[int] = None, cache: Optional[BuildCache] = None,
+             make_dirs: bool = True) -> List[Result]:
+    """
+    run jobs over a process pool and return results in the same order as `jobs`
+
+    Jobs of the same input file run together in one process, so that it is parsed only once.
+
+    :param create_generator: see `run_group`
+    :param workers: number of worker processes, `None` for cpu count, 1 to run in current process
+    :param cache: skip jobs whose output is up to date in it and record generated ones, `None` to disable
+    :param make_dirs: create missing output directories instead of reporting them
+    """
+    # an output generated by more than one job is an error for all of them
+    counts = Counter(job.output_file for job in jobs)
+    results: List[Optional[Result]] = [None] * len(jobs)
+    keys: Dict[int, str] = {}
+    groups: Dict[str, List[int]] = {}  # input file -> indices of pending jobs
+    for index, job in enumerate(jobs):
+        if counts[job.output_file] > 1:
+            results[index] = Result(job, f'output file "{job.output_file}" is generated by more than one job')
+            continue
+        if cache is not None:
+            try:
+                keys[index] = get_key(create_generator(job))
+            except OSError:
+                pass  # reported by `check_job`
+            else:
+                if cache.is_fresh(job.output_file, keys[index]):
+                    results[index] = Result(job, None, True)
+                    continue
+        groups.setdefault(job.input_file, []).append(index)
+
+    workers = min(workers or os.cpu_count() or 1, len(groups) or 1)
+    group_jobs = [[jobs[index] for index in indices] for indices in groups.values()]
+    if workers == 1:
+        group_results = [run_group(jobs_, create_generator, force, make_dirs) for jobs_ in group_jobs]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(run_group, jobs_, create_generator, force, make_dirs) for jobs_ in group_jobs]
+            group_results = [future.result() for future in futures]
+    for indices, results_ in zip(groups.values(), group_results):
+        for index, result in zip(indices, results_):
+            results[index] = result
+
+    if cache is not None:
+        for indices in groups.values():
+            for index in indices:
+                if results[index].error is None and index in keys:
+                    cache.update(jobs[index].input_file, jobs[index].output_file, keys[index])
+        try:
+            cache.save()
+        except OSError as e:
+            # outputs are generated anyway, they are only regenerated next time
+            print(f'failed to save build cache "{cache.cache_file}": {e}')
+    return results
+
+
+def print_report(results: List[Result]):
+    """
+    print per-file success/failure and a summary line
+    """
+    for result in results:
+        if result.error is not None:
+            print(f'[FAIL] {result.job.input_file} -> {result.job.output_file}: {result.error}')
+        elif result.skipped:
+            print(f'[SKIP] {result.job.input_file} -> {result.job.output_file} (up to date)')
+        elif result.unchanged:
+            print(f'[ OK ] {result.job.input_file} -> {result.job.output_file} (unchanged)')
+        else:
+            print(f'[ OK ] {result.job.input_file} -> {result.job.output_file}')
+    failed = sum(result.error is not None for result in results)
+    skipped = sum(result.skipped for result in results)
+    unchanged = sum(result.unchanged for result in results)
+    written = len(results) - failed - skipped - unchanged
+    print(f'{len(results) - failed} succeeded ({written} written, {unchanged} unchanged, {skipped} up to date), '
+          f'{failed} failed')
+
+
+def get_timings(results: List[Result]) -> List[Dict]:
+    """
+    get timings of generated jobs as json: [{'input': ..., 'output': ..., 'phases': {...}, 'total': ...}, ...]
+    """
+    return [
+        {
+            'input': result.job.input_file,
+            'output': result.job.output_file,
+            'phases': result.timings,
+            'total': sum(result.timings.values()),
+        }
+        for result in results if result.timings is not None
+    ]
+
+
+def print_timings(results: List[Result]):
+    """
+    print durations of phases of generated jobs, slowest first
+    """
+    for timings in sorted(get_timings(results), key=lambda timings: timings['total'], reverse=True):
+        phases = ', '.join(f'{name} {seconds * 1000:.2f} ms' for name, seconds in timings['phases'].items())
+        print(f'{timings["total"] * 1000:9.2f} ms  {timings["input"]} -> {timings["output"]}: {phases}')
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from generator import BaseGenerator
+
+
+DEFAULT_CACHE_FILE = '.config_gui_cache.json'
+
+
+def hash_file(path: str) -> str:
+    """
+    sha256 of file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_key(generator: BaseGenerator) -> str:
+    """
+    get cache key of a generator: hash of its input file content and options
+    """
+    options = json.dumps(generator.get_options(), sort_keys=True)
+    return hashlib.sha256(f'{hash_file(generator.input_file)}\n{options}'.encode('utf-8')).hexdigest()
+
+
+class BuildCache:
+    """
+    on-disk build manifest, records for each output file the key it was generated from and a hash of its content:
+
+    {output_file: {'input': input_file, 'key': key, 'output': output_hash}, ...}
+    """
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE):
+        """
+        :param cache_file: path of the manifest, created on `save` if not exists
+        """
+        self.cache_file = os.path.abspath(cache_file)
+        self.entries = self.__load()
+        self.__updated: Dict[str, Optional[Dict[str, str]]] = {}  # None for removed entries
+
+    def is_fresh(self, output_file: str, key: str) -> bool:
+        """
+        whether `output_file` was generated from `key` and is still intact
+        """
+        entry = self.entries.get(output_file)
+        if entry is None or entry['key'] != key or not os.path.isfile(output_file):
+            return False
+        try:
+            return hash_file(output_file) == entry['output']
+        except OSError:
+            return False
+
+    def update(self, input_file: str, output_file: str, key: str):
+        """
+        record that `output_file` has just been generated from `input_file` with `key`
+        """
+        entry = {'input': input_file, 'key': key, 'output': hash_file(output_file)}
+        self.entries[output_file] = entry
+        self.__updated[output_file] = entry
+
+    def prune(self) -> List[str]:
+        """
+        remove entries whose input or output file no longer exists and return their output files
+        """
+        removed = [output_file for output_file, entry in self.entries.items()
+                   if not os.path.isfile(entry['input']) or not os.path.isfile(output_file)]
+        for output_file in removed:
+            del self.entries[output_file]
+            self.__updated[output_file] = None
+        return removed
+
+    def save(self):
+        """
+        merge changes into the manifest on disk, so that concurrent runs don't lose each other's entries
+
+        :raise OSError: if the manifest can not be written, changes are kept to be saved again
+        """
+        if not self.__updated:
+            return
+        entries = self.__load()
+        for output_file, entry in self.__updated.items():
+            if entry is None:
+                entries.pop(output_file, None)
+            else:
+                entries[output_file] = entry
+        temp_file = f'{self.cache_file}.{os.getpid()}.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
+            os.replace(temp_file, self.cache_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        self.entries = entries
+        self.__updated.clear()
+
+    def __load(self) -> Dict[str, Dict[str, str]]:
+        """
+        load manifest from disk, a missing or broken manifest is treated as empty
+        """
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
@@ -0,0 +1,96 @@
+import html
+from typing import Iterator, List, Optional
+
+import ir
+from ir import Field, Fieldset, NumberField, Spec, TextField
+from spec_parser import parse_spec
+
+
+COMPILED_SUFFIX = '.cspec'  # default suffix of compiled specs, which are recognized by `ir.MAGIC` instead
+
+
+def compile_spec(input_file: str, output_file: str, parser: str = 'fast') -> Spec:
+    """
+    parse and validate a spec (*.html) by the same rules as generation, and write it in the binary format of `ir`,
+    which generators load without parsing
+
+    :param parser: spec parser, 'fast' or 'bs4', see `spec_parser.PARSERS`
+    """
+    with open(input_file, 'rb') as f:
+        content = f.read()
+    if content.startswith(ir.MAGIC):
+        raise ValueError(f'"{input_file}" is compiled already')
+    # same as reading in text mode, see `BaseGenerator.parse`
+    spec = parse_spec(content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n'), parser)
+    with open(output_file, 'wb') as f:
+        ir.dump(spec, f)
+    return spec
+
+
+def decompile_spec(input_file: str, output_file: str) -> Spec:
+    """
+    write a compiled spec back to html for editing, which is parsed into the same spec
+    """
+    with open(input_file, 'rb') as f:
+        spec = ir.load(f)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.writelines(iter_html(spec))
+    return spec
+
+
+def iter_html(spec: Spec) -> Iterator[str]:
+    """
+    generate html of a spec and yield lines
+    """
+    yield from [
+        '<!DOCTYPE html>\n',
+        f'<html lang="{_escape(spec.lang)}">\n',
+        '<head>\n',
+        '    <meta charset="UTF-8">\n',
+        f'    <title>{_escape_text(spec.title)}</title>\n',
+        '</head>\n',
+        f'<body width="{spec.width}" height="{spec.height}" src="{_escape(spec.config_path)}">\n',
+    ]
+    for item in spec.content:
+        if isinstance(item, Fieldset):
+            yield f'    <fieldset id="{_escape(item.id)}">\n'
+            yield f'        <legend>{_escape_text(item.text)}</legend>\n'
+            for field in item.fields:
+                yield f'        {_get_field_html(field)}\n'
+            yield '    </fieldset>\n'
+        else:
+            yield f'    {_get_field_html(item)}\n'
+    yield from [
+        '</body>\n',
+        '</html>\n',
+    ]
+
+
+def _get_field_html(field: Field) -> str:
+    attrs: List[str] = [f'type="{field.type}"', f'id="{_escape(field.id)}"']
+    if field.name != field.id:
+        attrs.append(f'name="{_escape(field.name)}"')
+    if isinstance(field, TextField):
+        attrs.extend([
+            f'placeholder="{_escape(field.placeholder)}"',
+            f'value="{_escape(field.value)}"',
+            f'minlength="{field.minlength}"',
+            f'maxlength="{field.maxlength}"',
+        ])
+    elif isinstance(field, NumberField):
+        attrs.extend([
+            f'value="{field.value}"',
+            f'min="{field.min}"',
+            f'max="{field.max}"',
+            f'step="{field.step}"',
+        ])
+    return f'<p><span>{_escape_text(field.text)}</span><input {" ".join(attrs)}></p>'
+
+
+def _escape(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+def _escape_text(text: Optional[str]) -> str:
+    # an empty label is parsed as None, see `spec_parser._Node.string`
+    return '' if text is None else html.escape(text, quote=False)
@@ -1,71 +1,698 @@
-from typing import Dict, List
+import functools
+import hashlib
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
-from bs4 import BeautifulSoup
+import ir
+from ir import Field, Fieldset, Item, NumberField, Spec, TextField
+from spec_parser import parse_spec, stream_spec
+from version import VERSION
 
 
 class BaseGenerator:
     """
     base class for all generators
     """
-    def __init__(self, input_file: str, output_file: str, data_name: str, window_name: str):
+    STYLES = ('classic',)  # supported styles of generated code, the first one is the default
+
+    def __init__(self, input_file: Optional[str], output_file: Optional[str], data_name: str, window_name: str,
+                 parser: str = 'fast', ir_cache: Optional[str] = None, style: Optional[str] = None,
+                 stream: bool = False):
         """
-        :param input_file: input file path (*.html)
-        :param output_file: output file path (*.py)
+        :param input_file: input file path (*.html), None if only `generate_code` is used
+        :param output_file: output file path (*.py), None if only `generate_code` is used
         :param data_name: class name of ConfigData
         :param window_name: class name of ConfigWindow
+        :param parser: spec parser, 'fast' or 'bs4', see `spec_parser.PARSERS`
+        :param ir_cache: directory of serialized specs, so that an unchanged input file is not parsed again.
+                         Specs are never removed from it, and it is safe to delete as a whole
+        :param style: style of generated code, one of `STYLES`, None for the default
+        :param stream: let `generate` parse the input file in chunks while generating code, instead of loading
+                       the whole spec first, so that memory doesn't grow with the input file except for generated code.
+                       Only the fast parser can stream, and `ir_cache` is not used. Compiled specs are loaded as usual.
         """
+        if style is not None and style not in self.STYLES:
+            raise ValueError(f'style "{style}" not supported by {type(self).__name__}')
+        if stream and parser != 'fast':
+            raise ValueError(f'parser "{parser}" can not stream')
         self.input_file = input_file
         self.output_file = output_file
         self.data_name = data_name
         self.window_name = window_name
+        self.parser = parser
+        self.ir_cache = ir_cache
+        self.style = style or self.STYLES[0]
+        self.stream = stream
+        self.timings: Dict[str, float] = {}  # phase name -> seconds, filled by `phase`
+        self.phase_hooks: List[Callable[[str, float], None]] = []  # called with phase name and seconds
+        self.written: Optional[bool] = None  # whether `generate` wrote output file, False if it was unchanged
+
+    def generate(self, spec: Optional[Spec] = None):
+        """
+        generate code from input file into output file
+
+        :param spec: spec of the input file if it has been loaded already (e.g. by a generator of another module),
+                     so that it is not parsed again
+        """
+        if spec is None and self.stream and not ir.is_serialized_file(self.input_file):
+            # items are parsed while generating code depending on them, the file is open until all are parsed
+            with open(self.input_file, 'r', encoding='utf-8') as f:
+                spec, items = stream_spec(f)
+                self.__emit(spec, items, 'stream')
+            return
+        if spec is None:
+            spec = self.load_spec()
+        self.__emit(spec, None, 'emit')
 
-    def generate(self):
+    def __emit(self, spec: Spec, items: Optional[Iterator[Item]], phase: str):
+        with self.phase(phase):
+            chunks = self.iter_code(spec, items)
+        with self.phase('write'):
+            self.written = write_if_changed(self.output_file, chunks)
+
+    def generate_code(self, text: str) -> str:
+        """
+        generate code from spec text and return it, without touching any file
         """
-        generate code
+        spec = self.parse(text)
+        with self.phase('emit'):
+            return ''.join(self.iter_code(spec))
+
+    def iter_code(self, spec: Spec, items: Optional[Iterator[Item]] = None) -> Iterator[str]:
+        """
+        generate code by `spec` and return an iterator of chunks, so that it can be written without being joined
+
+        :param items: items of the content of `spec` if they are streamed, `spec.content` if None
         """
         raise NotImplementedError()
 
+    def get_options(self) -> Dict[str, str]:
+        """
+        get everything except the input file that affects generated code, used as part of the build cache key
+        """
+        return {
+            'generator': f'{type(self).__module__}.{type(self).__qualname__}',
+            'version': VERSION,
+            # generated code changes with the implementation even if VERSION is not bumped
+            'implementation': get_implementation_hash(type(self).__module__),
+            'data_name': self.data_name,
+            'window_name': self.window_name,
+            'parser': self.parser,
+            'style': self.style,
+        }
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        measure a phase of generation, add its duration to `timings` and call `phase_hooks` when it ends
+
+        Phases of all generators: read, load_ir (IR cache hit or compiled input), parse (text to IR), dump_ir, emit, write,
+        and stream (read, parse and emit of code depending on fields) instead of the first five if streaming
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + duration
+            for hook in self.phase_hooks:
+                hook(name, duration)
+
+    def load_spec(self) -> Spec:
+        """
+        load spec from input file, which is either html or compiled (see `compiler.compile_spec`),
+        or from IR cache if it has been parsed before
+        """
+        with self.phase('read'):
+            with open(self.input_file, 'rb') as f:
+                content = f.read()
+        if content.startswith(ir.MAGIC):
+            with self.phase('load_ir'):
+                return ir.loads(content)
+        cache_file = None
+        if self.ir_cache:
+            # cached specs parsed by an older implementation of the parser are not loaded
+            parser = f'\n{self.parser}\n{get_implementation_hash("spec_parser")}'
+            key = hashlib.sha256(content + parser.encode('utf-8')).hexdigest()
+            cache_file = os.path.join(self.ir_cache, f'{key}.ir')
+            try:
+                with self.phase('load_ir'), open(cache_file, 'rb') as f:
+                    return ir.load(f)
+            except (OSError, ValueError, EOFError, TypeError):
+                pass  # not cached yet, or written by another format version
+
+        spec = self.parse(content.decode('utf-8'))
+        if cache_file:
+            with self.phase('dump_ir'):
+                os.makedirs(self.ir_cache, exist_ok=True)
+                temp_file = f'{cache_file}.{os.getpid()}.tmp'
+                with open(temp_file, 'wb') as f:
+                    ir.dump(spec, f)
+                os.replace(temp_file, cache_file)
+        return spec
+
+    def parse(self, text: str) -> Spec:
+        """
+        parse spec text into IR
+        """
+        with self.phase('parse'):
+            # same as reading in text mode
+            return parse_spec(text.replace('\r\n', '\n').replace('\r', '\n'), self.parser)
+
+
+@functools.lru_cache(maxsize=None)
+def get_implementation_hash(module: str) -> str:
+    """
+    sha256 of source files of a generator module and of the modules parsing specs for it, computed once per process
+
+    :param module: name of the module defining the generator class
+    """
+    digest = hashlib.sha256()
+    for name in (module, 'ir', 'spec_parser'):
+        path = getattr(sys.modules.get(name), '__file__', None)
+        if path is None:
+            continue
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def write_if_changed(path: str, chunks: Iterable[str]) -> bool:
+    """
+    write text into a temp file next to `path` and atomically replace `path` with it,
+    unless `path` already has the same content, then it is left untouched to keep its mtime (and *.pyc) valid
+
+    :return: whether `path` was written
+    """
+    temp_file = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        if is_same_file_content(temp_file, path):
+            return False
+        if os.path.exists(path):
+            shutil.copymode(path, temp_file)
+        os.replace(temp_file, path)
+        return True
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def is_same_file_content(path: str, other: str) -> bool:
+    """
+    compare two files by size, then by bytes, False if any of them doesn't exist
+    """
+    try:
+        if os.path.getsize(path) != os.path.getsize(other):
+            return False
+        with open(path, 'rb') as f, open(other, 'rb') as f_other:
+            while True:
+                chunk = f.read(1 << 16)
+                if chunk != f_other.read(1 << 16):
+                    return False
+                if not chunk:
+                    return True
+    except OSError:
+        return False
+
 
 class PyQt5Generator(BaseGenerator):
     """
     config code generator for GUI software written in Python3 and PyQt5
     """
-    def __init__(self, input_file: str, output_file: str, data_name: str, window_name: str):
-        super().__init__(input_file, output_file, data_name, window_name)
+    STYLES = ('classic', 'compact')  # compact: field descriptor tables and generic loops instead of unrolled code
+    WIDGET_NAMES = {'number': 'spin_box', 'text': 'line_edit'}  # field type -> widget attribute prefix
+    VALUE_TYPES = {'number': 'int', 'text': 'str'}  # field type -> python type of value
+    PAGES = {'tabs': ('QTabWidget', 'addTab'), 'sections': ('QToolBox', 'addItem')}  # pages -> (widget, add method)
+
+    def __init__(self, input_file: Optional[str], output_file: Optional[str], data_name: str, window_name: str,
+                 parser: str = 'fast', ir_cache: Optional[str] = None, style: Optional[str] = None,
+                 pages: Optional[str] = None, hot_reload: bool = False, stream: bool = False):
+        """
+        :param pages: show each fieldset as a page of `PAGES` instead of a group box, and create widgets of a page
+                      when it is shown for the first time, None for group boxes
+        :param hot_reload: watch the config file in ConfigWindow, and reload it when changed by other programs
+        """
+        super().__init__(input_file, output_file, data_name, window_name, parser, ir_cache, style, stream)
+        if pages is not None and pages not in self.PAGES:
+            raise ValueError(f'pages "{pages}" not supported by {type(self).__name__}')
         self.module_name = 'PyQt5'
+        self.pages = pages
+        self.hot_reload = hot_reload
+
+    def get_options(self) -> Dict[str, str]:
+        options = super().get_options()
+        options['module_name'] = self.module_name
+        options['pages'] = self.pages
+        options['hot_reload'] = self.hot_reload
+        return options
 
-    def generate(self):
+    def iter_code(self, spec: Spec, items: Optional[Iterator[Item]] = None) -> Iterator[str]:
         """
-        generate code
+        generate code by `spec` and return an iterator of chunks, so that it can be written without being joined
+
+        Code depending on fields is generated when called, the rest is generated lazily while iterating.
         """
-        data = self.__get_data()
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.writelines(self.__get_code(data))
+        if items is None:
+            items = iter(spec.content)
+        if self.style == 'compact':
+            return self.__iter_compact_code(spec, self.__get_compact_sections(spec, items))
+        return self.__iter_code(spec, self.__get_sections(spec, items))
 
-    def __get_code(self, data: Dict) -> List[str]:
+    def __iter_code(self, spec: Spec, sections: '_Sections') -> Iterator[str]:
         """
-        generate code by `data` and return lines
+        yield chunks of code, with code depending on fields from `sections`
         """
-        lines = []
+        # import
+        yield from self.__get_import_statement()
+        yield '\n\n'  # 2 empty lines
+        # loading and writing config files
+        yield from self.__get_config_io_statement()
+        yield '\n\n'  # 2 empty lines
+        # class ConfigData
+        yield from self.__get_data_class_statement(spec, sections)
+        yield '\n\n'  # 2 empty lines
+        # class ConfigWindow
+        yield from self.__get_window_class_statement(spec, sections)
 
+    def __iter_compact_code(self, spec: Spec, sections: '_Sections') -> Iterator[str]:
+        """
+        yield chunks of code in compact style: field descriptor tables, then classes looping over them
+        """
         # import
-        lines.extend(self.__get_import_statement())
-        lines.extend(['\n', '\n'])  # 2 empty lines
+        import_statement = self.__get_import_statement()
+        import_statement.insert(import_statement.index('from typing import Callable\n'),
+                                'from functools import partialmethod\n')
+        yield from import_statement
+        yield '\n\n'  # 2 empty lines
+        # tables
+        yield '# fields: (id, name in config file, label text, type, initial value, *widget args),\n'
+        yield "# widget args are (min, max) of QSpinBox for type 'number' and (placeholder, max length) of QLineEdit\n"
+        yield '_FIELDS = (\n'
+        yield from sections.table_fields
+        yield ')\n'
+        yield f'# text fields checked by `{self.window_name}.check`: (id, min length, error message)\n'
+        yield '_CHECKS = (\n'
+        yield from sections.table_checks
+        yield ')\n'
+        yield f'# main layout of `{self.window_name}`: ids of top level fields and (id, legend text, field ids) of fieldsets\n'
+        yield '_LAYOUT = (\n'
+        yield from sections.table_layout
+        yield ')\n'
+        if self.pages:
+            yield '_FIELDS_BY_ID = {field[0]: field for field in _FIELDS}\n'
+        yield '\n\n'  # 2 empty lines
+        # loading and writing config files
+        yield from self.__get_config_io_statement()
+        yield '\n\n'  # 2 empty lines
         # class ConfigData
-        lines.extend(self.__get_data_class_statement(data))
-        lines.extend(['\n', '\n'])  # 2 empty lines
+        yield from self.__get_data_class_statement(spec, sections)
+        yield '\n\n'  # 2 empty lines
         # class ConfigWindow
-        lines.extend(self.__get_window_class_statement(data))
+        yield from self.__get_window_class_statement(spec, sections)
+        yield from [
+            '\n',
+            '\n',
+            f'# getters of config values, e.g. `window.{{id}}()`, set after the class like methods defined at its end\n',
+            f'for _id, *_ in _FIELDS:\n',
+            f'    setattr({self.window_name}, _id, partialmethod({self.window_name}._get_value, _id))\n',
+        ]
+
+    def __get_sections(self, spec: Spec, items: Iterator[Item]) -> '_Sections':
+        """
+        generate code depending on fields in a single traversal of `items` of `spec`, into a buffer for each section
+        """
+        sections = _Sections()
+        page_index = 0
+        for item in items:
+            if isinstance(item, Fieldset) and self.pages:
+                self.__add_page(spec, sections, item, page_index)
+                page_index += 1
+            elif isinstance(item, Fieldset):
+                sections.group_boxes.append(f"        self.__group_box_{item.id} = QGroupBox('{item.text}')\n")
+                sections.group_boxes.append(f"        layout_group_box_{item.id} = QFormLayout()\n")
+                for field in item.fields:
+                    self.__add_field(spec, sections, field, True)
+                    type_ = self.WIDGET_NAMES[field.type]
+                    sections.group_boxes.append(f"        layout_group_box_{item.id}.addRow(self.__label_{field.id}, self.__{type_}_{field.id})\n")
+                sections.group_boxes.append(f"        self.__group_box_{item.id}.setLayout(layout_group_box_{item.id})\n")
+                sections.group_boxes.append("\n")
+                sections.layout.append(f"        layout_main.addWidget(self.__group_box_{item.id})\n")
+            else:
+                self.__add_field(spec, sections, item, False)
+                type_ = self.WIDGET_NAMES[item.type]
+                sections.layout.append(f"        layout_{item.id} = QFormLayout()\n")
+                sections.layout.append(f"        layout_{item.id}.addRow(self.__label_{item.id}, self.__{type_}_{item.id})\n")
+                sections.layout.append(f"        layout_main.addLayout(layout_{item.id})\n")
+        if page_index:
+            sections.group_boxes.append("\n")
+        return sections
+
+    def __add_page(self, spec: Spec, sections: '_Sections', fieldset: Fieldset, index: int):
+        """
+        generate code of a fieldset shown as a page, whose widgets are created by its own method when it is shown
+        for the first time, while save and cancel skip them and check reads their values from ConfigData until then
+        """
+        widget, add = self.PAGES[self.pages]
+        if index == 0:
+            sections.group_boxes.append(f"        self.__pages = {widget}()\n")
+            sections.layout.append("        layout_main.addWidget(self.__pages)\n")
+            sections.init_end.extend([
+                "        self.__pages.currentChanged.connect(self.__on_page_shown)\n",
+                "        self.__on_page_shown(self.__pages.currentIndex())\n",
+            ])
+        sections.group_boxes.extend([
+            f"        self.__page_{fieldset.id} = None  # created by __build_page_{fieldset.id}\n",
+            f"        scroll_area_{fieldset.id} = QScrollArea()\n",
+            f"        scroll_area_{fieldset.id}.setWidgetResizable(True)\n",
+            f"        self.__pages.{add}(scroll_area_{fieldset.id}, '{fieldset.text}')\n",
+        ])
+        sections.pages.extend([
+            f"        if index == {index} and self.__page_{fieldset.id} is None:\n",
+            f"            self.__build_page_{fieldset.id}()\n",
+        ])
+
+        # widgets go to the method creating the page, update and cancel only run after it
+        widgets_start, update_start, cancel_start = len(sections.widgets), len(sections.update), len(sections.cancel)
+        reload_start = len(sections.reload)
+        for field in fieldset.fields:
+            self.__add_field(spec, sections, field, True, fieldset.id)
+        widgets = sections.widgets[widgets_start:]
+        del sections.widgets[widgets_start:]
+        guard = f"        if self.__page_{fieldset.id} is not None:\n"
+        for section, start in ((sections.update, update_start), (sections.cancel, cancel_start),
+                               (sections.reload, reload_start)):
+            if len(section) > start:
+                section[start:] = [guard] + ['    ' + line for line in section[start:]]
+
+        sections.page_builders.extend([
+            "\n",
+            f"    def __build_page_{fieldset.id}(self):\n",
+            *widgets,
+            f"        layout_page_{fieldset.id} = QFormLayout()\n",
+        ])
+        for field in fieldset.fields:
+            type_ = self.WIDGET_NAMES[field.type]
+            sections.page_builders.append(f"        layout_page_{fieldset.id}.addRow(self.__label_{field.id}, self.__{type_}_{field.id})\n")
+        sections.page_builders.extend([
+            f"        self.__page_{fieldset.id} = QWidget()\n",
+            f"        self.__page_{fieldset.id}.setLayout(layout_page_{fieldset.id})\n",
+            f"        self.__pages.widget({index}).setWidget(self.__page_{fieldset.id})\n",
+        ])
+
+    def __get_compact_sections(self, spec: Spec, items: Iterator[Item]) -> '_Sections':
+        """
+        generate rows of field descriptor tables in a single traversal of `items` of `spec`,
+        other sections are generic loops over the tables
+        """
+        sections = _Sections()
+        for item in items:
+            if isinstance(item, Fieldset):
+                for field in item.fields:
+                    self.__add_compact_field(spec, sections, field, True)
+                field_ids = ', '.join(f"'{field.id}'" for field in item.fields) + (',' if len(item.fields) == 1 else '')
+                sections.table_layout.append(f"    ('{item.id}', '{item.text}', ({field_ids})),\n")
+            else:
+                self.__add_compact_field(spec, sections, item, False)
+                sections.table_layout.append(f"    '{item.id}',\n")
+
+        # ConfigData.__init__ and ConfigData.save
+        sections.data_init.extend([
+            "        for id_, name, _, _, value, *_ in _FIELDS:\n",
+            "            setattr(self, id_, __config_data.get(name, value))\n",
+        ])
+        sections.data_save.append("            name: getattr(self, id_) for id_, name, *_ in _FIELDS\n")
+
+        if self.pages:
+            self.__add_compact_pages(sections)
+        else:
+            # ConfigWindow.__init__
+            sections.widgets.extend([
+                "        self.__labels = {}  # field id -> QLabel\n",
+                "        self.__widgets = {}  # field id -> QSpinBox or QLineEdit\n",
+                "        for id_, _, text, type_, _, *args in _FIELDS:\n",
+                "            self.__labels[id_] = QLabel(text)\n",
+                "            if type_ == 'number':\n",
+                "                widget = self.__widgets[id_] = QSpinBox()\n",
+                "                widget.setRange(*args)\n",
+                "                widget.setValue(getattr(self.__config_data, id_))\n",
+                "            else:\n",
+                "                widget = self.__widgets[id_] = QLineEdit()\n",
+                "                widget.setText(getattr(self.__config_data, id_))\n",
+                "                widget.setPlaceholderText(args[0])\n",
+                "                widget.setMaxLength(args[1])\n",
+            ])
+            sections.group_boxes.append("        self.__group_boxes = {}  # fieldset id -> QGroupBox\n")
+            sections.layout.extend([
+                "        for item in _LAYOUT:\n",
+                "            layout = QFormLayout()\n",
+                "            if isinstance(item, str):\n",
+                "                layout.addRow(self.__labels[item], self.__widgets[item])\n",
+                "                layout_main.addLayout(layout)\n",
+                "            else:\n",
+                "                id_, text, field_ids = item\n",
+                "                for field_id in field_ids:\n",
+                "                    layout.addRow(self.__labels[field_id], self.__widgets[field_id])\n",
+                "                group_box = self.__group_boxes[id_] = QGroupBox(text)\n",
+                "                group_box.setLayout(layout)\n",
+                "                layout_main.addWidget(group_box)\n",
+            ])
+
+            # ConfigWindow.on_button_save_clicked, check and cancel
+            sections.update.extend([
+                "        for id_, _, _, type_, *_ in _FIELDS:\n",
+                "            widget = self.__widgets[id_]\n",
+                "            setattr(self.__config_data, id_, widget.value() if type_ == 'number' else widget.text())\n",
+            ])
+            sections.check.extend([
+                "        for id_, min_length, message in _CHECKS:\n",
+                "            if len(self.__widgets[id_].text()) < min_length:\n",
+            ])
+            sections.cancel.extend([
+                "        for id_, _, _, type_, *_ in _FIELDS:\n",
+                "            if type_ == 'number':\n",
+                "                self.__widgets[id_].setValue(getattr(self, id_)())\n",
+                "            else:\n",
+                "                self.__widgets[id_].setText(getattr(self, id_)())\n",
+            ])
+        if self.hot_reload:
+            sections.reload.extend([
+                "        for id_ in changed:\n",
+                "            widget = self.__widgets.get(id_)  # None if its page is not shown yet\n",
+                "            if isinstance(widget, QSpinBox):\n",
+                "                widget.setValue(getattr(self, id_)())\n",
+                "            elif widget is not None:\n",
+                "                widget.setText(getattr(self, id_)())\n",
+            ])
+        title = self.__get_check_title(spec)
+        if title is not None:
+            sections.check.append(f"                QMessageBox.warning(self, '{title}', message)\n")
+        sections.check.append("                return False\n")
+
+        # getters are set by id after the class, see `__iter_compact_code`
+        sections.getters.extend([
+            "\n",
+            "    def _get_value(self, id_: str):\n",
+            "        return getattr(self.__config_data, id_)\n",
+        ])
+        return sections
+
+    def __add_compact_pages(self, sections: '_Sections'):
+        """
+        generate loops of ConfigWindow showing fieldsets as pages, whose widgets are created when they are shown
+        for the first time, while save and cancel skip them and check reads their values from ConfigData until then
+        """
+        widget, add = self.PAGES[self.pages]
+        # ConfigWindow.__init__
+        sections.widgets.extend([
+            "        self.__labels = {}  # field id -> QLabel, fields of a page are added when it is shown\n",
+            "        self.__widgets = {}  # field id -> QSpinBox or QLineEdit, same as labels\n",
+        ])
+        sections.group_boxes.extend([
+            f"        self.__pages = {widget}()\n",
+            "        self.__page_fields = []  # field ids of each page, None after its widgets are created\n",
+        ])
+        sections.layout.extend([
+            "        for item in _LAYOUT:\n",
+            "            if isinstance(item, str):\n",
+            "                layout_main.addLayout(self.__create_form((item,)))\n",
+            "            else:\n",
+            "                _, text, field_ids = item\n",
+            "                if not self.__page_fields:\n",
+            "                    layout_main.addWidget(self.__pages)\n",
+            "                scroll_area = QScrollArea()\n",
+            "                scroll_area.setWidgetResizable(True)\n",
+            f"                self.__pages.{add}(scroll_area, text)\n",
+            "                self.__page_fields.append(field_ids)\n",
+        ])
+        sections.init_end.extend([
+            "        self.__pages.currentChanged.connect(self.__on_page_shown)\n",
+            "        self.__on_page_shown(self.__pages.currentIndex())\n",
+        ])
+
+        # ConfigWindow.on_button_save_clicked, check and cancel
+        sections.update.extend([
+            "        for id_, _, _, type_, *_ in _FIELDS:\n",
+            "            widget = self.__widgets.get(id_)\n",
+            "            if widget is not None:\n",
+            "                setattr(self.__config_data, id_, widget.value() if type_ == 'number' else widget.text())\n",
+        ])
+        sections.check.extend([
+            "        for id_, min_length, message in _CHECKS:\n",
+            "            widget = self.__widgets.get(id_)\n",
+            "            if len(getattr(self.__config_data, id_) if widget is None else widget.text()) < min_length:\n",
+        ])
+        sections.cancel.extend([
+            "        for id_, _, _, type_, *_ in _FIELDS:\n",
+            "            widget = self.__widgets.get(id_)\n",
+            "            if widget is None:\n",
+            "                continue\n",
+            "            if type_ == 'number':\n",
+            "                widget.setValue(getattr(self, id_)())\n",
+            "            else:\n",
+            "                widget.setText(getattr(self, id_)())\n",
+        ])
+
+        # page methods
+        sections.page_builders.extend([
+            "\n",
+            "    def __on_page_shown(self, index: int):\n",
+            "        # create widgets of a page when it is shown for the first time\n",
+            "        if index < 0 or self.__page_fields[index] is None:\n",
+            "            return\n",
+            "        field_ids, self.__page_fields[index] = self.__page_fields[index], None\n",
+            "        page = QWidget()\n",
+            "        page.setLayout(self.__create_form(field_ids))\n",
+            "        self.__pages.widget(index).setWidget(page)\n",
+            "\n",
+            "    def __create_form(self, field_ids) -> QFormLayout:\n",
+            "        # create widgets of fields and return a form layout of them\n",
+            "        layout = QFormLayout()\n",
+            "        for id_ in field_ids:\n",
+            "            _, _, text, type_, _, *args = _FIELDS_BY_ID[id_]\n",
+            "            label = self.__labels[id_] = QLabel(text)\n",
+            "            if type_ == 'number':\n",
+            "                widget = self.__widgets[id_] = QSpinBox()\n",
+            "                widget.setRange(*args)\n",
+            "                widget.setValue(getattr(self.__config_data, id_))\n",
+            "            else:\n",
+            "                widget = self.__widgets[id_] = QLineEdit()\n",
+            "                widget.setText(getattr(self.__config_data, id_))\n",
+            "                widget.setPlaceholderText(args[0])\n",
+            "                widget.setMaxLength(args[1])\n",
+            "            layout.addRow(label, widget)\n",
+            "        return layout\n",
+        ])
+
+    def __add_compact_field(self, spec: Spec, sections: '_Sections', field: Field, in_fieldset: bool):
+        """
+        generate table rows of a field
+        """
+        if isinstance(field, NumberField):
+            sections.table_fields.append(f"    ('{field.id}', '{field.name}', '{field.text}', 'number', {field.value}, {field.min}, {field.max}),\n")
+        elif isinstance(field, TextField):
+            sections.table_fields.append(f"    ('{field.id}', '{field.name}', '{field.text}', 'text', '{field.value}', '{field.placeholder}', {field.maxlength}),\n")
+            if field.minlength > 0:
+                message = self.__get_check_message(spec, field, in_fieldset)
+                message = 'None' if message is None else f"'{message}'"
+                sections.table_checks.append(f"    ('{field.id}', {field.minlength}, {message}),\n")
+
+    def __add_field(self, spec: Spec, sections: '_Sections', field: Field, in_fieldset: bool,
+                    page: Optional[str] = None):
+        """
+        generate code of a field into all sections
 
-        return lines
+        :param page: id of the fieldset if it is a page, whose widgets may not be created yet
+        """
+        # ConfigData.__init__ and ConfigData.save
+        if isinstance(field, NumberField):
+            sections.data_init.append(f"        self.{field.id} = __config_data.get('{field.name}', {field.value})\n")
+        else:
+            sections.data_init.append(f"        self.{field.id} = __config_data.get('{field.name}', '{field.value}')\n")
+        sections.data_save.append(f"            '{field.name}': self.{field.id},\n")
+
+        # ConfigWindow.__init__, on_button_save_clicked, check and cancel
+        if isinstance(field, NumberField):
+            sections.widgets.extend([
+                f"        self.__label_{field.id} = QLabel('{field.text}')\n",
+                f"        self.__spin_box_{field.id} = QSpinBox()\n",
+                f"        self.__spin_box_{field.id}.setRange({field.min}, {field.max})\n",
+                f"        self.__spin_box_{field.id}.setValue(self.__config_data.{field.id})\n",
+            ])
+            sections.update.append(f"        self.__config_data.{field.id} = self.__spin_box_{field.id}.value()\n")
+            sections.cancel.append(f"        self.__spin_box_{field.id}.setValue(self.{field.id}())\n")
+            if self.hot_reload:
+                sections.reload.extend([
+                    f"        if '{field.id}' in changed:\n",
+                    f"            self.__spin_box_{field.id}.setValue(self.{field.id}())\n",
+                ])
+        elif isinstance(field, TextField):
+            sections.widgets.extend([
+                f"        self.__label_{field.id} = QLabel('{field.text}')\n",
+                f"        self.__line_edit_{field.id} = QLineEdit()\n",
+                f"        self.__line_edit_{field.id}.setText(self.__config_data.{field.id})\n",
+                f"        self.__line_edit_{field.id}.setPlaceholderText('{field.placeholder}')\n",
+                f"        self.__line_edit_{field.id}.setMaxLength({field.maxlength})\n",
+            ])
+            sections.update.append(f"        self.__config_data.{field.id} = self.__line_edit_{field.id}.text()\n")
+            sections.cancel.append(f"        self.__line_edit_{field.id}.setText(self.{field.id}())\n")
+            if self.hot_reload:
+                sections.reload.extend([
+                    f"        if '{field.id}' in changed:\n",
+                    f"            self.__line_edit_{field.id}.setText(self.{field.id}())\n",
+                ])
+            if field.minlength > 0:
+                text = f"self.__line_edit_{field.id}.text()"
+                if page is not None:
+                    text = f"{text} if self.__page_{page} is not None else self.__config_data.{field.id}"
+                sections.check.append(f"        if len({text}) < {field.minlength}:\n")
+                message = self.__get_check_message(spec, field, in_fieldset)
+                if message is not None:
+                    sections.check.append(f"            QMessageBox.warning(self, '{self.__get_check_title(spec)}', '{message}')\n")
+                sections.check.append("            return False\n")
+
+        # getter
+        sections.getters.extend([
+            f"\n",
+            f"    def {field.id}(self) -> {self.VALUE_TYPES[field.type]}:\n",
+            f"        return self.__config_data.{field.id}\n",
+        ])
+
+    @staticmethod
+    def __get_check_title(spec: Spec) -> Optional[str]:
+        """
+        get title of the error message window of `check`, None if there is no message in `spec.lang`
+        """
+        return {'en': 'Error', 'zh-CN': '错误'}.get(spec.lang)
+
+    @staticmethod
+    def __get_check_message(spec: Spec, field: TextField, in_fieldset: bool) -> Optional[str]:
+        """
+        get error message of a text field shorter than its minlength, None if there is no message in `spec.lang`
+        """
+        if spec.lang == 'en':
+            return f'{field.text} must be at least {field.minlength} characters long.'
+        if spec.lang == 'zh-CN':
+            # message of fields in fieldsets ends with a period
+            period = '.' if in_fieldset else ''
+            return f'{field.text}必须至少{field.minlength}个字符{period}'
+        return None
 
     def __get_import_statement(self) -> List[str]:
         """
         generate code of import statement and return lines
         """
         return [
+            'import atexit\n',
             'import json\n',
             'import os\n',
+            'import threading\n',
             'import traceback\n',
             'from typing import Callable\n',
             '\n',
@@ -74,46 +701,38 @@ class PyQt5Generator(BaseGenerator):
             f'from {self.module_name}.QtGui import *\n',
         ]
 
-    def __get_data_class_statement(self, data: Dict) -> List[str]:
+    def __get_data_class_statement(self, spec: Spec, sections: '_Sections') -> Iterator[str]:
         """
-        generate code of class ConfigData and return lines
+        generate code of class ConfigData and yield lines
         """
-        lines = [
+        yield from [
             f'class {self.data_name}:\n',
             f'    """\n',
             f'    ATTENTION:\n',
             f'    1. Don\'t use current `{self.data_name}` in your own code. It can only be used in `{self.window_name}`\n',
             f'    2. Don\'t call `save` of any `{self.data_name}`. `{self.window_name}` will control it.\n',
+            f'    3. Call `{self.data_name}.invalidate()` if the config file may have changed without changing its mtime and size.\n',
+            f'    4. Call `{self.data_name}.flush()` before exit (also called at exit), because config is written in background.\n',
             f'    """\n',
             # init
             f'    def __init__(self):\n',
             f'        # set config path\n',
-            f"        self.__config_path = os.path.abspath(r'{data['config_path']}')\n",
+            f"        self.__config_path = os.path.abspath(r'{spec.config_path}')\n",
             f'        # load config\n',
             f'        __config_data = {{}}\n',
             f'        file_exist = True\n',
             f'        try:\n',
-            f"            with open(self.__config_path, 'r', encoding='utf-8') as f:\n",
-            f'                __config_data = json.load(f)\n',
+            f'            __config_data = _load_config(self.__config_path)\n',
             f'        except FileNotFoundError:\n',
             f'            file_exist = False\n',
             f'        except Exception:\n',
             f'            traceback.print_exc()\n',
-            f'        # init config data\n',
         ]
-        for item in data['content']:
-            if item['category'] == 'input':
-                if item['type'] == 'number':
-                    lines.append(f"        self.{item['id']} = __config_data.get('{item['name']}', {item['value']})\n")
-                else:
-                    lines.append(f"        self.{item['id']} = __config_data.get('{item['name']}', '{item['value']}')\n")
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    if item_['type'] == 'number':
-                        lines.append(f"        self.{item_['id']} = __config_data.get('{item_['name']}', {item_['value']})\n")
-                    else:
-                        lines.append(f"        self.{item_['id']} = __config_data.get('{item_['name']}', '{item_['value']}')\n")
-        lines.extend([
+        if self.hot_reload:
+            yield f'        self.__saved_data = __config_data  # data loaded or saved last, not loaded again by `reload`\n'
+        yield f'        # init config data\n'
+        yield from sections.data_init
+        yield from [
             "        # init config file\n",
             "        if not file_exist:\n",
             "            if not os.path.exists(os.path.dirname(self.__config_path)):\n",
@@ -122,29 +741,187 @@ class PyQt5Generator(BaseGenerator):
             "\n",
             "    def save(self):\n",
             "        config_data = {\n",
-        ])
-        for item in data['content']:
-            if item['category'] == 'input':
-                lines.append(f"            '{item['name']}': self.{item['id']},\n")
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    lines.append(f"            '{item_['name']}': self.{item_['id']},\n")
-        lines.append('        }\n')
-        lines.extend([
+        ]
+        yield from sections.data_save
+        yield from [
+            "        }\n",
+            "        # skip writing if the config file, or data being written to it, has the same data,\n",
+            "        # a missing or broken file is written\n",
             "        try:\n",
-            "            with open(self.__config_path, 'w', encoding='utf-8') as f:\n",
-            "                json.dump(config_data, f, ensure_ascii=False)\n",
+            "            if _load_config(self.__config_path) == config_data:\n",
+            "                return\n",
             "        except Exception:\n",
-            "            traceback.print_exc()\n",
-        ])
+            "            pass\n",
+        ]
+        if self.hot_reload:
+            yield "        self.__saved_data = config_data\n"
+        yield from [
+            "        writer = _config_writers.get(self.__config_path)\n",
+            "        if writer is None:\n",
+            "            writer = _config_writers[self.__config_path] = _ConfigWriter(self.__config_path)\n",
+            "        writer.save(config_data)\n",
+            "\n",
+            "    @classmethod\n",
+            "    def invalidate(cls):\n",
+            '        """\n',
+            f"        drop the parsed config file, so that the next `{self.data_name}` reads it again\n",
+            '        """\n',
+            f"        config_path = os.path.abspath(r'{spec.config_path}')\n",
+            "        cached = _config_cache.get(config_path)\n",
+            "        # data being written is newer than the file, keep it\n",
+            "        if cached is not None and cached[0] is not None:\n",
+            "            del _config_cache[config_path]\n",
+            "\n",
+            "    @classmethod\n",
+            "    def flush(cls):\n",
+            '        """\n',
+            "        block until saved config is written\n",
+            '        """\n',
+            f"        writer = _config_writers.get(os.path.abspath(r'{spec.config_path}'))\n",
+            "        if writer is not None:\n",
+            "            writer.flush()\n",
+        ]
+        if self.hot_reload:
+            yield from [
+                "\n",
+                "    def reload(self) -> set:\n",
+                '        """\n',
+                "        read the config file again if its mtime or size changed, and return ids of changed values\n",
+                '        """\n',
+                "        try:\n",
+                "            __config_data = _load_config(self.__config_path)\n",
+                "        except Exception:\n",
+                "            # removed, or being written by another program, changed again when done\n",
+                "            return set()\n",
+                "        # same data as loaded or saved, the file is unchanged or written by `save`\n",
+                "        if __config_data is self.__saved_data:\n",
+                "            return set()\n",
+                "        values = dict(vars(self))\n",
+            ]
+            yield from sections.data_init
+            yield from [
+                "        changed = {id_ for id_, value in vars(self).items() if values[id_] != value}\n",
+                "        self.__saved_data = __config_data\n",
+                "        return changed\n",
+            ]
 
-        return lines
+    def __get_config_io_statement(self) -> List[str]:
+        """
+        generate code loading config files with a cache and writing them in background, shared by all `ConfigData`s,
+        and return lines
+        """
+        return [
+            "# parsed config files: absolute path -> ((mtime_ns, size), data), signature is None while data is being written\n",
+            "_config_cache = {}\n",
+            "# background writers of config files: absolute path -> _ConfigWriter\n",
+            "_config_writers = {}\n",
+            "\n",
+            "\n",
+            "def _load_config(path: str) -> dict:\n",
+            '    """\n',
+            "    load a config file, parsed data is reused while mtime and size of the file are unchanged,\n",
+            "    and data being written is used instead of the file\n",
+            '    """\n',
+            "    cached = _config_cache.get(path)\n",
+            "    if cached is not None and cached[0] is None:\n",
+            "        return cached[1]\n",
+            "    try:\n",
+            "        stat = os.stat(path)\n",
+            "    except OSError:\n",
+            "        # removed, cached data is no longer in the file\n",
+            "        _config_cache.pop(path, None)\n",
+            "        raise\n",
+            "    signature = (stat.st_mtime_ns, stat.st_size)\n",
+            "    if cached is not None and cached[0] == signature:\n",
+            "        return cached[1]\n",
+            "    with open(path, 'r', encoding='utf-8') as f:\n",
+            "        data = json.load(f)\n",
+            "    _config_cache[path] = (signature, data)\n",
+            "    return data\n",
+            "\n",
+            "\n",
+            "class _ConfigWriter(QRunnable):\n",
+            '    """\n',
+            "    writer of a config file in `QThreadPool`, data saved while it is waiting or writing is coalesced into one write\n",
+            '    """\n',
+            "    DELAY = 0.2  # seconds to wait for more data before writing\n",
+            "\n",
+            "    def __init__(self, path: str):\n",
+            "        super().__init__()\n",
+            "        self.setAutoDelete(False)  # started again by later saves\n",
+            "        self.__path = path\n",
+            "        self.__data = None  # data waiting to be written\n",
+            "        self.__running = False\n",
+            "        self.__flushing = False\n",
+            "        self.__condition = threading.Condition()\n",
+            "\n",
+            "    def save(self, data: dict):\n",
+            "        with self.__condition:\n",
+            "            self.__data = data\n",
+            "            _config_cache[self.__path] = (None, data)\n",
+            "            if not self.__running:\n",
+            "                self.__running = True\n",
+            "                QThreadPool.globalInstance().start(self)\n",
+            "\n",
+            "    def flush(self):\n",
+            "        with self.__condition:\n",
+            "            self.__flushing = True\n",
+            "            self.__condition.notify_all()\n",
+            "            while self.__running:\n",
+            "                self.__condition.wait()\n",
+            "            self.__flushing = False\n",
+            "\n",
+            "    def run(self):\n",
+            "        with self.__condition:\n",
+            "            if not self.__flushing:\n",
+            "                self.__condition.wait(self.DELAY)\n",
+            "        while True:\n",
+            "            with self.__condition:\n",
+            "                data, self.__data = self.__data, None\n",
+            "                if data is None:\n",
+            "                    self.__running = False\n",
+            "                    self.__condition.notify_all()\n",
+            "                    return\n",
+            "            self.__write(data)\n",
+            "\n",
+            "    def __write(self, data: dict):\n",
+            "        # write a temp file and replace the config file with it, so that it is never left half written\n",
+            "        temp_path = f'{self.__path}.{os.getpid()}.tmp'\n",
+            "        signature = None\n",
+            "        try:\n",
+            "            with open(temp_path, 'w', encoding='utf-8') as f:\n",
+            "                json.dump(data, f, ensure_ascii=False)\n",
+            "            os.replace(temp_path, self.__path)\n",
+            "            stat = os.stat(self.__path)\n",
+            "            signature = (stat.st_mtime_ns, stat.st_size)\n",
+            "        except Exception:\n",
+            "            traceback.print_exc()\n",
+            "        with self.__condition:\n",
+            "            # newer data is waiting otherwise\n",
+            "            if self.__data is None:\n",
+            "                if signature is None:\n",
+            "                    _config_cache.pop(self.__path, None)\n",
+            "                else:\n",
+            "                    _config_cache[self.__path] = (signature, data)\n",
+            "\n",
+            "\n",
+            "@atexit.register\n",
+            "def _flush_config_writers():\n",
+            '    """\n',
+            "    write config saved just before exit, in case `flush` is not called\n",
+            '    """\n',
+            "    for writer in list(_config_writers.values()):\n",
+            "        writer.flush()\n",
+            "    # let writers return to Qt before the interpreter is finalized\n",
+            "    if _config_writers:\n",
+            "        QThreadPool.globalInstance().waitForDone()\n",
+        ]
 
-    def __get_window_class_statement(self, data: Dict) -> List[str]:
+    def __get_window_class_statement(self, spec: Spec, sections: '_Sections') -> Iterator[str]:
         """
-        generate code of class ConfigWindow and return lines
+        generate code of class ConfigWindow and yield lines
         """
-        lines = [
+        yield from [
             f"class {self.window_name}(QWidget):\n",
             f'    """\n',
             f"    ATTENTION:\n",
@@ -157,100 +934,57 @@ class PyQt5Generator(BaseGenerator):
             f"        super().__init__()\n",
             f"        self.__config_data = {self.data_name}()\n",
             f"        self.__config_changed = config_changed\n",
-            f"        self.setWindowTitle('{data['title']}')\n",
-            f"        self.resize({data['width']}, {data['height']})\n",
-            f"        self.setFixedSize({data['width']}, {data['height']})\n",
+            f"        self.setWindowTitle('{spec.title}')\n",
+            f"        self.resize({spec.width}, {spec.height})\n",
+            f"        self.setFixedSize({spec.width}, {spec.height})\n",
             f"        self.setWindowModality(Qt.WindowModality.ApplicationModal)\n",
             f"\n",
         ]
-        for item in data['content']:
-            if item['category'] == 'input':
-                if item['type'] == 'number':
-                    lines.extend([
-                        f"        self.__label_{item['id']} = QLabel('{item['text']}')\n",
-                        f"        self.__spin_box_{item['id']} = QSpinBox()\n",
-                        f"        self.__spin_box_{item['id']}.setRange({item['min']}, {item['max']})\n",
-                        f"        self.__spin_box_{item['id']}.setValue(self.__config_data.{item['id']})\n",
-                    ])
-                elif item['type'] == 'text':
-                    lines.extend([
-                        f"        self.__label_{item['id']} = QLabel('{item['text']}')\n",
-                        f"        self.__line_edit_{item['id']} = QLineEdit()\n",
-                        f"        self.__line_edit_{item['id']}.setText(self.__config_data.{item['id']})\n",
-                        f"        self.__line_edit_{item['id']}.setPlaceholderText('{item['placeholder']}')\n",
-                        f"        self.__line_edit_{item['id']}.setMaxLength({item['maxlength']})\n",
-                    ])
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    if item_['type'] == 'number':
-                        lines.extend([
-                            f"        self.__label_{item_['id']} = QLabel('{item_['text']}')\n",
-                            f"        self.__spin_box_{item_['id']} = QSpinBox()\n",
-                            f"        self.__spin_box_{item_['id']}.setRange({item_['min']}, {item_['max']})\n",
-                            f"        self.__spin_box_{item_['id']}.setValue(self.__config_data.{item_['id']})\n",
-                        ])
-                    elif item_['type'] == 'text':
-                        lines.extend([
-                            f"        self.__label_{item_['id']} = QLabel('{item_['text']}')\n",
-                            f"        self.__line_edit_{item_['id']} = QLineEdit()\n",
-                            f"        self.__line_edit_{item_['id']}.setText(self.__config_data.{item_['id']})\n",
-                            f"        self.__line_edit_{item_['id']}.setPlaceholderText('{item_['placeholder']}')\n",
-                            f"        self.__line_edit_{item_['id']}.setMaxLength({item_['maxlength']})\n",
-                        ])
-        lines.extend([
+        yield from sections.widgets
+        yield from [
             f"        self.__button_save = QPushButton()\n",
-            f"        self.__button_save.setText('{'Save' if data['lang'] == 'en' else '保存'}')\n",
+            f"        self.__button_save.setText('{'Save' if spec.lang == 'en' else '保存'}')\n",
             f"        self.__button_save.clicked.connect(self.on_button_save_clicked)\n",
             f"        self.__button_cancel = QPushButton()\n",
-            f"        self.__button_cancel.setText('{'Cancel' if data['lang'] == 'en' else '取消'}')\n",
+            f"        self.__button_cancel.setText('{'Cancel' if spec.lang == 'en' else '取消'}')\n",
             f"        self.__button_cancel.clicked.connect(self.on_button_cancel_clicked)\n",
             f"\n",
-        ])
-        for item in data['content']:
-            if item['category'] == 'fieldset':
-                lines.append(f"        self.__group_box_{item['id']} = QGroupBox('{item['text']}')\n")
-                lines.append(f"        layout_group_box_{item['id']} = QFormLayout()\n")
-                for item_ in item['items']:
-                    type_ = {'number': 'spin_box', 'text': 'line_edit'}[item_['type']]
-                    lines.append(f"        layout_group_box_{item['id']}.addRow(self.__label_{item_['id']}, self.__{type_}_{item_['id']})\n")
-                lines.append(f"        self.__group_box_{item['id']}.setLayout(layout_group_box_{item['id']})\n")
-                lines.append("\n")
-        lines.append(f"        layout_main = QVBoxLayout()\n")
-        for item in data['content']:
-            if item['category'] == 'fieldset':
-                lines.append(f"        layout_main.addWidget(self.__group_box_{item['id']})\n")
-            elif item['category'] == 'input':
-                type_ = {'number': 'spin_box', 'text': 'line_edit'}[item['type']]
-                lines.append(f"        layout_{item['id']} = QFormLayout()\n")
-                lines.append(f"        layout_{item['id']}.addRow(self.__label_{item['id']}, self.__{type_}_{item['id']})\n")
-                lines.append(f"        layout_main.addLayout(layout_{item['id']})\n")
-        lines.extend([
+        ]
+        yield from sections.group_boxes
+        yield f"        layout_main = QVBoxLayout()\n"
+        yield from sections.layout
+        yield from [
             "        layout_button = QHBoxLayout()\n",
             "        layout_button.setAlignment(Qt.AlignmentFlag.AlignRight)\n",
             "        layout_button.addWidget(self.__button_save)\n",
             "        layout_button.addWidget(self.__button_cancel)\n",
             "        layout_main.addLayout(layout_button)\n",
             "        self.setLayout(layout_main)\n",
+        ]
+        yield from sections.init_end
+        if self.hot_reload:
+            yield from [
+                "        # reload config when the config file is changed by other programs, after changes stop for a while\n",
+                "        self.__reload_timer = QTimer(self)\n",
+                "        self.__reload_timer.setSingleShot(True)\n",
+                "        self.__reload_timer.setInterval(200)\n",
+                "        self.__reload_timer.timeout.connect(self.reload)\n",
+                "        # the directory is watched too, because the file is replaced when written\n",
+                "        self.__config_watcher = QFileSystemWatcher(self)\n",
+                "        self.__config_watcher.fileChanged.connect(lambda path: self.__reload_timer.start())\n",
+                "        self.__config_watcher.directoryChanged.connect(lambda path: self.__reload_timer.start())\n",
+                "        self.__watch_config()\n",
+            ]
+        yield from [
             "\n",
             "    def on_button_save_clicked(self):\n",
             "        # check input\n",
             "        if not self.check():\n",
             "            return\n",
             "        # update config\n",
-        ])
-        for item in data['content']:
-            if item['category'] == 'input':
-                if item['type'] == 'number':
-                    lines.append(f"        self.__config_data.{item['id']} = self.__spin_box_{item['id']}.value()\n")
-                elif item['type'] == 'text':
-                    lines.append(f"        self.__config_data.{item['id']} = self.__line_edit_{item['id']}.text()\n")
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    if item_['type'] == 'number':
-                        lines.append(f"        self.__config_data.{item_['id']} = self.__spin_box_{item_['id']}.value()\n")
-                    elif item_['type'] == 'text':
-                        lines.append(f"        self.__config_data.{item_['id']} = self.__line_edit_{item_['id']}.text()\n")
-        lines.extend([
+        ]
+        yield from sections.update
+        yield from [
             "        # save config\n",
             "        self.__config_data.save()\n",
             "        # call config_changed\n",
@@ -263,25 +997,9 @@ class PyQt5Generator(BaseGenerator):
             '        check input, show error message window and finally return whether input is valid\n',
             '        :return: True if input is valid, False otherwise\n',
             '        """\n',
-        ])
-        for item in data['content']:
-            if item['category'] == 'input' and item['type'] == 'text' and item['minlength'] > 0:
-                lines.append(f"        if len(self.__line_edit_{item['id']}.text()) < {item['minlength']}:\n")
-                if data['lang'] == 'en':
-                    lines.append(f"            QMessageBox.warning(self, 'Error', '{item['text']} must be at least {item['minlength']} characters long.')\n")
-                elif data['lang'] == 'zh-CN':
-                    lines.append(f"            QMessageBox.warning(self, '错误', '{item['text']}必须至少{item['minlength']}个字符')\n")
-                lines.append("            return False\n")
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    if item_['type'] == 'text' and item_['minlength'] > 0:
-                        lines.append(f"        if len(self.__line_edit_{item_['id']}.text()) < {item_['minlength']}:\n")
-                        if data['lang'] == 'en':
-                            lines.append(f"            QMessageBox.warning(self, 'Error', '{item_['text']} must be at least {item_['minlength']} characters long.')\n")
-                        elif data['lang'] == 'zh-CN':
-                            lines.append(f"            QMessageBox.warning(self, '错误', '{item_['text']}必须至少{item_['minlength']}个字符.')\n")
-                        lines.append("            return False\n")
-        lines.extend([
+        ]
+        yield from sections.check
+        yield from [
             "        return True\n",
             "\n",
             "    def on_button_cancel_clicked(self):\n",
@@ -292,146 +1010,72 @@ class PyQt5Generator(BaseGenerator):
             "\n",
             "    def cancel(self):\n",
             "        # reset config\n",
-        ])
-        for item in data['content']:
-            if item['category'] == 'input':
-                if item['type'] == 'number':
-                    lines.append(f"        self.__spin_box_{item['id']}.setValue(self.{item['id']}())\n")
-                elif item['type'] == 'text':
-                    lines.append(f"        self.__line_edit_{item['id']}.setText(self.{item['id']}())\n")
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    if item_['type'] == 'number':
-                        lines.append(f"        self.__spin_box_{item_['id']}.setValue(self.{item_['id']}())\n")
-                    elif item_['type'] == 'text':
-                        lines.append(f"        self.__line_edit_{item_['id']}.setText(self.{item_['id']}())\n")
-        lines.extend([
+        ]
+        yield from sections.cancel
+        yield from [
             "        # close window\n",
             "        self.close()\n",
-        ])
-        for item in data['content']:
-            if item['category'] == 'input':
-                if item['type'] == 'number':
-                    lines.extend([
-                        f"\n",
-                        f"    def {item['id']}(self) -> int:\n",
-                        f"        return self.__config_data.{item['id']}\n",
-                    ])
-                elif item['type'] == 'text':
-                    lines.extend([
-                        f"\n",
-                        f"    def {item['id']}(self) -> str:\n",
-                        f"        return self.__config_data.{item['id']}\n",
-                    ])
-            elif item['category'] == 'fieldset':
-                for item_ in item['items']:
-                    if item_['type'] == 'number':
-                        lines.extend([
-                            f"\n",
-                            f"    def {item_['id']}(self) -> int:\n",
-                            f"        return self.__config_data.{item_['id']}\n",
-                        ])
-                    elif item_['type'] == 'text':
-                        lines.extend([
-                            f"\n",
-                            f"    def {item_['id']}(self) -> str:\n",
-                            f"        return self.__config_data.{item_['id']}\n",
-                        ])
-        return lines
-
-    def __get_data(self) -> Dict:
-        """
-        get data from input file
-        """
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
-        data = {}
-
-        # html.lang
-        data['lang'] = soup.html.get('lang', 'en')
-        # head.title
-        data['title'] = soup.head.title.string
-        # body.width, body.height, body.src
-        data['width'] = int(soup.body.get('width', '800'))
-        data['height'] = int(soup.body.get('height', '600'))
-        data['config_path'] = soup.body.get('src', './res/config.json')
-        # all input tags or fieldset tags in body
-        # input tags: {'category': 'input', 'attr_name': 'attr_value', ...}
-        # fieldset tags: {'category': 'fieldset', 'attr_name': 'attr_value', ..., 'items': [input tags]}
-        data['content'] = []
-        for tag in soup.body.children:
-            if tag.name == 'p':  # input tag is wrapped in <p> tag with <span>
-                data['content'].append(self.__get_input_tag_data_from(tag))
-            elif tag.name == 'fieldset':
-                data['content'].append(self.__get_fieldset_tag_data_from(tag))
-
-        return data
-
-    def __get_input_tag_data_from(self, tag: BeautifulSoup) -> Dict:
-        """
-        get data from:
-
-        <p>
-            <span>label</span>
-            <input attr_name="attr_value" ...>
-        </p>
-        """
-        data = {}
-        # tags
-        span_tag = tag.find('span')
-        input_tag = tag.find('input')
-
-        # common data
-        data['category'] = 'input'  # input or fieldset
-        data['text'] = span_tag.string  # label text, will be shown in window
-        data['type'] = input_tag.get('type', 'text')  # input type
-        data['id'] = input_tag.get('id', '')  # input id, will be used in code
-        if not data['id']:
-            raise ValueError('id is required')
-        data['name'] = input_tag.get('name', data['id'])  # input name, will be used in config file
-
-        # unique data for each type of input tag
-        if data['type'] == 'text':
-            data['placeholder'] = input_tag.get('placeholder', '')  # placeholder text, will be shown in window
-            data['value'] = input_tag.get('value', '')  # initial value, will be used in config file
-            data['minlength'] = int(input_tag.get('minlength', 0))  # minimum text length
-            data['maxlength'] = int(input_tag.get('maxlength', 10))  # maximum text length
-        elif data['type'] == 'number':
-            data['value'] = int(input_tag.get('value', 0))  # initial value, will be used in config file
-            data['min'] = int(input_tag.get('min', 0))  # minimum value
-            data['max'] = int(input_tag.get('max', 10))  # maximum value
-            data['step'] = int(input_tag.get('step', 1))  # step value
-        else:
-            raise Exception(f'unsupported input type: {data["type"]}')
-
-        return data
-
-    def __get_fieldset_tag_data_from(self, tag: BeautifulSoup) -> Dict:
-        """
-        get data from:
+        ]
+        if self.hot_reload:
+            yield from [
+                "\n",
+                "    def reload(self):\n",
+                '        """\n',
+                "        reload the config file if it changed, reset widgets of changed values and call config_changed\n",
+                '        """\n',
+                "        self.__watch_config()\n",
+                "        changed = self.__config_data.reload()\n",
+                "        if not changed:\n",
+                "            return\n",
+            ]
+            yield from sections.reload
+            yield from [
+                "        self.__config_changed()\n",
+                "\n",
+                "    def __watch_config(self):\n",
+                "        # watch the config file and its directory if they exist and are not watched,\n",
+                "        # a replaced file is no longer watched\n",
+                f"        config_path = os.path.abspath(r'{spec.config_path}')\n",
+                "        watched = self.__config_watcher.files() + self.__config_watcher.directories()\n",
+                "        for path in (config_path, os.path.dirname(config_path)):\n",
+                "            if path not in watched and os.path.exists(path):\n",
+                "                self.__config_watcher.addPath(path)\n",
+            ]
+        if sections.pages:
+            yield from [
+                "\n",
+                "    def __on_page_shown(self, index: int):\n",
+                "        # create widgets of a page when it is shown for the first time\n",
+            ]
+            yield from sections.pages
+        yield from sections.page_builders
+        yield from sections.getters
 
-        <fieldset>
-            <legend>label</legend>
-            <p>input ...</p>
-            ...
-        </fieldset>
-        """
-        data = {}
-        # tags
-        legend_tag = tag.find('legend')
-        p_tags = tag.find_all('p')
 
-        # data
-        data['category'] = 'fieldset'  # input or fieldset
-        data['id'] = tag.get('id', '')  # fieldset id, will be used in code (QGroupBox)
-        if not data['id']:
-            raise ValueError('id is required')
-        data['text'] = legend_tag.string  # label text, will be shown in window (QGroupBox)
-        data['items'] = []  # input tags
-        for p_tag in p_tags:
-            data['items'].append(self.__get_input_tag_data_from(p_tag))
+class _Sections:
+    """
+    buffers of generated code depending on fields, one for each section, filled in order of fields
+    """
+    __slots__ = ('data_init', 'data_save', 'widgets', 'group_boxes', 'layout', 'init_end', 'update', 'check', 'cancel',
+                 'reload', 'pages', 'page_builders', 'getters', 'table_fields', 'table_checks', 'table_layout')
 
-        return data
+    def __init__(self):
+        self.data_init: List[str] = []  # ConfigData.__init__
+        self.data_save: List[str] = []  # ConfigData.save
+        self.widgets: List[str] = []  # ConfigWindow.__init__, widgets
+        self.group_boxes: List[str] = []  # ConfigWindow.__init__, group boxes
+        self.layout: List[str] = []  # ConfigWindow.__init__, main layout
+        self.init_end: List[str] = []  # ConfigWindow.__init__, after main layout is set
+        self.update: List[str] = []  # ConfigWindow.on_button_save_clicked
+        self.check: List[str] = []  # ConfigWindow.check
+        self.cancel: List[str] = []  # ConfigWindow.cancel
+        self.reload: List[str] = []  # ConfigWindow.reload, if hot reload is enabled
+        self.pages: List[str] = []  # ConfigWindow.__on_page_shown, if fieldsets are pages
+        self.page_builders: List[str] = []  # ConfigWindow methods creating widgets of pages
+        self.getters: List[str] = []  # ConfigWindow getters
+        self.table_fields: List[str] = []  # rows of _FIELDS, compact style only
+        self.table_checks: List[str] = []  # rows of _CHECKS, compact style only
+        self.table_layout: List[str] = []  # rows of _LAYOUT, compact style only
 
 
 class PySide2Generator(PyQt5Generator):
@@ -441,6 +1085,9 @@ class PySide2Generator(PyQt5Generator):
     Based on `PyQt5Generator` instead of `BaseGenerator`, because `PySide2` is similar to `PyQt5`.
     The only difference of source code will be the import statement.
     """
-    def __init__(self, input_file: str, output_file: str, data_name: str, window_name: str):
-        super().__init__(input_file, output_file, data_name, window_name)
-        self.moduel_name = 'PySide2'
+    def __init__(self, input_file: Optional[str], output_file: Optional[str], data_name: str, window_name: str,
+                 parser: str = 'fast', ir_cache: Optional[str] = None, style: Optional[str] = None,
+                 pages: Optional[str] = None, hot_reload: bool = False, stream: bool = False):
+        super().__init__(input_file, output_file, data_name, window_name, parser, ir_cache, style, pages, hot_reload,
+                         stream)
+        self.module_name = 'PySide2'
@@ -0,0 +1,215 @@
+import marshal
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+
+MAGIC = b'CGGIR'
+FORMAT_VERSION = 1
+
+
+class Element:
+    """
+    base class of IR elements, compared and printed by their slots
+    """
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__all_slots())
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({", ".join(f"{name}={getattr(self, name)!r}" for name in self.__all_slots())})'
+
+    @classmethod
+    def __all_slots(cls) -> List[str]:
+        return [name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ())]
+
+
+class Field(Element):
+    """
+    base class of input fields:
+
+    <p>
+        <span>text</span>
+        <input id="id" name="name" ...>
+    </p>
+    """
+    __slots__ = ('id', 'name', 'text')
+    type = ''  # type attribute of input tag
+
+    def __init__(self, id: str, name: str, text: Optional[str]):
+        """
+        :param id: input id, will be used in code
+        :param name: input name, will be used in config file
+        :param text: label text, will be shown in window
+        """
+        self.id = id
+        self.name = name
+        self.text = text
+
+
+class TextField(Field):
+    """
+    <input type="text">, shown as QLineEdit
+    """
+    __slots__ = ('placeholder', 'value', 'minlength', 'maxlength')
+    type = 'text'
+
+    def __init__(self, id: str, name: str, text: Optional[str], placeholder: str = '', value: str = '',
+                 minlength: int = 0, maxlength: int = 10):
+        """
+        :param placeholder: placeholder text, will be shown in window
+        :param value: initial value, will be used in config file
+        :param minlength: minimum text length
+        :param maxlength: maximum text length
+        """
+        super().__init__(id, name, text)
+        self.placeholder = placeholder
+        self.value = value
+        self.minlength = minlength
+        self.maxlength = maxlength
+
+
+class NumberField(Field):
+    """
+    <input type="number">, shown as QSpinBox
+    """
+    __slots__ = ('value', 'min', 'max', 'step')
+    type = 'number'
+
+    def __init__(self, id: str, name: str, text: Optional[str], value: int = 0, min: int = 0, max: int = 10,
+                 step: int = 1):
+        """
+        :param value: initial value, will be used in config file
+        :param min: minimum value
+        :param max: maximum value
+        :param step: step value
+        """
+        super().__init__(id, name, text)
+        self.value = value
+        self.min = min
+        self.max = max
+        self.step = step
+
+
+class Fieldset(Element):
+    """
+    <fieldset id="id"><legend>text</legend>fields ...</fieldset>, shown as QGroupBox
+    """
+    __slots__ = ('id', 'text', 'fields')
+
+    def __init__(self, id: str, text: Optional[str], fields: List[Field]):
+        """
+        :param id: fieldset id, will be used in code
+        :param text: legend text, will be shown in window
+        """
+        self.id = id
+        self.text = text
+        self.fields = fields
+
+
+Item = Union[Field, Fieldset]
+
+
+class Spec(Element):
+    """
+    the whole spec:
+
+    <html lang="lang">
+    <head><title>title</title></head>
+    <body width="width" height="height" src="config_path">content ...</body>
+    </html>
+    """
+    __slots__ = ('lang', 'title', 'width', 'height', 'config_path', 'content')
+
+    def __init__(self, lang: str = 'en', title: Optional[str] = None, width: int = 800, height: int = 600,
+                 config_path: str = './res/config.json', content: Optional[List[Item]] = None):
+        self.lang = lang
+        self.title = title
+        self.width = width
+        self.height = height
+        self.config_path = config_path
+        self.content: List[Item] = [] if content is None else content
+
+    def fields(self) -> Iterator[Field]:
+        """
+        iterate over all fields, including those in fieldsets
+        """
+        for item in self.content:
+            if isinstance(item, Fieldset):
+                yield from item.fields
+            else:
+                yield item
+
+    def fieldsets(self) -> Iterator[Fieldset]:
+        return (item for item in self.content if isinstance(item, Fieldset))
+
+
+# serialization: IR is converted to nested tuples of builtin types and written by `marshal`
+_TEXT, _NUMBER, _FIELDSET = 0, 1, 2
+
+
+def to_tuple(item: Union[Item, Spec]) -> Tuple:
+    """
+    convert IR element to nested tuples of builtin types
+    """
+    if isinstance(item, TextField):
+        return _TEXT, item.id, item.name, item.text, item.placeholder, item.value, item.minlength, item.maxlength
+    if isinstance(item, NumberField):
+        return _NUMBER, item.id, item.name, item.text, item.value, item.min, item.max, item.step
+    if isinstance(item, Fieldset):
+        return _FIELDSET, item.id, item.text, tuple(to_tuple(field) for field in item.fields)
+    return (item.lang, item.title, item.width, item.height, item.config_path,
+            tuple(to_tuple(item_) for item_ in item.content))
+
+
+def _item_from_tuple(value: Tuple) -> Item:
+    if value[0] == _TEXT:
+        return TextField(*value[1:])
+    if value[0] == _NUMBER:
+        return NumberField(*value[1:])
+    if value[0] == _FIELDSET:
+        return Fieldset(value[1], value[2], [_item_from_tuple(field) for field in value[3]])
+    raise ValueError(f'unknown element kind: {value[0]}')
+
+
+def from_tuple(value: Tuple) -> Spec:
+    """
+    convert nested tuples from `to_tuple` back to spec
+    """
+    *attrs, content = value
+    return Spec(*attrs, [_item_from_tuple(item) for item in content])
+
+
+def dumps(spec: Spec) -> bytes:
+    """
+    serialize spec to bytes: magic, format version, then marshalled tuples
+    """
+    return MAGIC + bytes([FORMAT_VERSION]) + marshal.dumps(to_tuple(spec), 4)
+
+
+def loads(data: bytes) -> Spec:
+    """
+    deserialize spec from bytes of `dumps`
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError('not a serialized spec')
+    version = data[len(MAGIC)] if len(data) > len(MAGIC) else None
+    if version != FORMAT_VERSION:
+        raise ValueError(f'unsupported serialized spec version: {version}')
+    return from_tuple(marshal.loads(data[len(MAGIC) + 1:]))
+
+
+def is_serialized_file(path: str) -> bool:
+    """
+    whether a file starts with the magic of `dumps`
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def dump(spec: Spec, f: BinaryIO):
+    f.write(dumps(spec))
+
+
+def load(f: BinaryIO) -> Spec:
+    return loads(f.read())
@@ -1,33 +1,105 @@
 import argparse
 import os
 import sys
-from typing import Dict, Type
 
-from generator import BaseGenerator, PyQt5Generator, PySide2Generator
+# only light modules are imported here, so that --support, --version and argument errors are fast,
+# others (and bs4 in particular) are imported when they are used, see scripts/check_startup.py
+from api import get_generator_class, support
+from version import VERSION
 
 
-support: Dict[str, Dict[str, Type[BaseGenerator]]] = {
-    'PYTHON3': {
-        'PYQT5': PyQt5Generator,
-        'PYSIDE2': PySide2Generator,
-    },
-}
-
 if __name__ == '__main__':
     # avoid relative path errors due to starting programs from other paths
     os.chdir(os.path.split(os.path.realpath(__file__))[0])
 
+    # subcommands converting specs between html and compiled format
+    if len(sys.argv) > 1 and sys.argv[1] in ('compile', 'decompile'):
+        command = sys.argv[1]
+        parser = argparse.ArgumentParser(f'main.py {command}', description=(
+            'validate a spec (*.html) and write it in a binary format, which -i accepts and loads without parsing'
+            if command == 'compile' else 'write a compiled spec back to html for editing'))
+        parser.add_argument('-i', '--input', type=str, required=True, help='input file path')
+        parser.add_argument('-o', '--output', type=str, help='output file path, default is input file path with '
+                                                             'suffix .cspec for compile, .html for decompile')
+        if command == 'compile':
+            parser.add_argument('-p', '--parser', type=str, help='spec parser, fast or bs4', default='fast',
+                                choices=['fast', 'bs4'])
+        parser.add_argument('-f', '--force', action='store_true', help='force to write output file, even if it already exists')
+        args = parser.parse_args(sys.argv[2:])
+        from compiler import COMPILED_SUFFIX, compile_spec, decompile_spec
+        output = args.output or os.path.splitext(args.input)[0] + (COMPILED_SUFFIX if command == 'compile' else '.html')
+        if os.path.exists(output) and not args.force:
+            print(f'output file "{os.path.abspath(output)}" already exists, use -f to overwrite it')
+            sys.exit(1)
+        try:
+            if command == 'compile':
+                compile_spec(args.input, output, args.parser)
+            else:
+                decompile_spec(args.input, output)
+        except Exception as e:
+            print(f'{type(e).__name__}: {e}')
+            sys.exit(1)
+        print(f'{command}d "{os.path.abspath(args.input)}" -> "{os.path.abspath(output)}"')
+        sys.exit(0)
+
     # parse args
-    parser = argparse.ArgumentParser('code generator for ConfigData and ConfigWindow in GUI softwares')
-    parser.add_argument('-i', '--input', type=str, help='input file path (*.html)')
-    parser.add_argument('-o', '--output', type=str, help='output file path (*.py)')
+    parser = argparse.ArgumentParser('code generator for ConfigData and ConfigWindow in GUI softwares',
+                                     epilog='subcommands: compile and decompile specs, see `main.py compile -h`')
+    parser.add_argument('-i', '--input', type=str, nargs='+', default=[],
+                        help='input file path (*.html, or compiled by `main.py compile`), '
+                             'or directories (searched for *.html) / glob patterns in batch mode')
+    parser.add_argument('-o', '--output', type=str, help='output file path (*.py), or output directory in batch mode, '
+                                                         '{module} in it is replaced by module name')
+    parser.add_argument('--manifest', type=str, help='json file of input -> output paths to generate in batch mode')
+    parser.add_argument('-j', '--jobs', type=int, help='number of worker processes in batch mode, default cpu count')
     parser.add_argument('-dn', '--data-name', type=str, help='class name of ConfigData', default='ConfigData')
     parser.add_argument('-wn', '--window-name', type=str, help='class name of ConfigWindow', default='ConfigWindow')
     parser.add_argument('-l', '--language', type=str, help='language of code', default='Python3')
-    parser.add_argument('-m', '--module', type=str, help='module name of GUI software', default='PyQt5')
-    parser.add_argument('-v', '--version', action='version', version='ConfigGUIGenerator 0.1')
+    parser.add_argument('-m', '--module', type=str, default='PyQt5',
+                        help='module name of GUI software, or comma separated names to generate for several modules '
+                             'from one parse, e.g. PyQt5,PySide2 -o config_{module}.py')
+    parser.add_argument('-p', '--parser', type=str, help='spec parser, fast or bs4', default='fast',
+                        choices=['fast', 'bs4'])
+    parser.add_argument('--style', type=str, default='classic', choices=['classic', 'compact'],
+                        help='style of generated code, compact uses field tables and loops for smaller and faster '
+                             'importing modules')
+    parser.add_argument('--pages', type=str, choices=['tabs', 'sections'],
+                        help='show each fieldset as a tab or a collapsible section, whose widgets are created when '
+                             'it is first shown, instead of a group box')
+    parser.add_argument('--hot-reload', action='store_true',
+                        help='watch the config file in generated windows, and reload it when changed by other programs')
+    parser.add_argument('--ir-cache', type=str,
+                        help='directory to cache parsed specs in, so that they are not parsed again, entries are never '
+                             'removed (not even by --prune-cache) and the directory is safe to delete')
+    parser.add_argument('--stream', action='store_true',
+                        help='parse input files in chunks while generating code, so that memory use doesn\'t grow with '
+                             'input files, only with the fast parser and without --ir-cache')
+    parser.add_argument('-v', '--version', action='version', version=f'ConfigGUIGenerator {VERSION}')
     parser.add_argument('-s', '--support', action='store_true', help='show support list')
     parser.add_argument('-f', '--force', action='store_true', help='force to write output file, even if it already exists')
+    parser.add_argument('--no-cache', action='store_true', help='regenerate outputs even if they are up to date')
+    parser.add_argument('--cache-file', type=str, help='path of build cache, default .config_gui_cache.json')
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help='stay resident and regenerate outputs whose input changed, until Ctrl+C')
+    parser.add_argument('--poll', action='store_true', help='poll file changes in watch mode instead of inotify')
+    parser.add_argument('--debounce', type=float, default=0.2,
+                        help='seconds without changes to wait before regenerating in watch mode')
+    parser.add_argument('--prune-cache', action='store_true',
+                        help='remove build cache entries whose input or output file no longer exists')
+    parser.add_argument('--timings', type=str, nargs='?', const='-',
+                        help='print durations of generation phases, or write them to the given json file')
+    parser.add_argument('--byte-compile', type=str, nargs='?', const='', metavar='LEVELS',
+                        help='byte-compile outputs in parallel for comma separated optimization levels (0, 1, 2), '
+                             'default the level of the current interpreter, not in watch mode')
+    parser.add_argument('--import-times', action='store_true',
+                        help='import each output and construct its window in a subprocess on the offscreen Qt '
+                             'platform, and print times and sizes, not in watch mode')
+    parser.add_argument('--max-import-ms', type=float,
+                        help='fail if import and window construction of an output take longer, implies --import-times')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='serve generation over http on localhost at the given port, see server.py')
+    parser.add_argument('--profile', type=str, help='write cProfile stats of generation to the given file, '
+                                                     'jobs run in current process')
     args = parser.parse_args()
 
     # check args
@@ -38,32 +110,129 @@ if __name__ == '__main__':
             for module in support[language]:
                 print('    ' + module)
         sys.exit(0)
-    if not args.input:
+    if args.serve is not None:
+        from server import serve
+        serve(port=args.serve)
+        sys.exit(0)
+    if args.prune_cache and not args.no_cache:
+        from cache import BuildCache
+        cache = BuildCache(args.cache_file) if args.cache_file else BuildCache()
+        removed = cache.prune()
+        try:
+            cache.save()
+        except OSError as e:
+            print(f'failed to save build cache "{cache.cache_file}": {e}')
+            sys.exit(1)
+        print(f'{len(removed)} build cache entries pruned')
+        if not args.input and not args.manifest:
+            sys.exit(0)
+    if not args.input and not args.manifest:
         print('input file path is required')
         sys.exit(1)
-    if not args.output:
+    if args.input and not args.output:
         print('output file path is required')
         sys.exit(1)
-    args.input = os.path.abspath(args.input)
-    args.output = os.path.abspath(args.output)
-    args.language = args.language.upper()
-    args.module = args.module.upper()
-    if not os.path.exists(args.input):
-        print(f'input file "{args.input}" not found')
-        sys.exit(1)
-    if not os.path.exists(os.path.dirname(args.output)):
-        print(f'output file directory "{os.path.dirname(args.output)}" not found')
+    if args.jobs is not None and args.jobs < 1:
+        print('number of jobs must be at least 1')
         sys.exit(1)
-    if os.path.exists(args.output) and not args.force:
-        print(f'output file "{args.output}" already exists')
+    if args.stream and args.parser != 'fast':
+        print(f'parser "{args.parser}" can not stream')
         sys.exit(1)
+    optimization_levels = [sys.flags.optimize]
+    if args.byte_compile:
+        try:
+            optimization_levels = sorted({int(level) for level in args.byte_compile.split(',')})
+        except ValueError:
+            optimization_levels = []
+        if not optimization_levels or not set(optimization_levels) <= {0, 1, 2}:
+            print(f'invalid optimization levels "{args.byte_compile}", must be comma separated 0, 1 or 2')
+            sys.exit(1)
+    args.language = args.language.upper()
     if args.language not in support:
         print(f'language "{args.language}" not supported')
         sys.exit(1)
-    if args.module not in support[args.language]:
-        print(f'language "{args.language}" not supported by module "{args.module}"')
+    # module names as given are kept for {module} in output paths, duplicates are ignored
+    modules = []
+    for module in args.module.split(','):
+        if module.upper() not in support[args.language]:
+            print(f'language "{args.language}" not supported by module "{module.upper()}"')
+            sys.exit(1)
+        if module.upper() not in (module_.upper() for module_ in modules):
+            modules.append(module)
+    if len(modules) > 1 and args.input and '{module}' not in args.output:
+        print('output path must contain "{module}" when generating for more than one module')
+        sys.exit(1)
+    from batch import GeneratorFactory, collect_jobs, get_timings, is_batch, print_report, print_timings, run_jobs
+    from cache import BuildCache
+    cache = None
+    if not args.no_cache:
+        cache = BuildCache(args.cache_file) if args.cache_file else BuildCache()
+    batch = is_batch(args.input, args.manifest)
+    if batch and args.input and os.path.isfile(args.output):
+        print(f'output directory "{os.path.abspath(args.output)}" is a file')
+        sys.exit(1)
+    try:
+        jobs = collect_jobs(args.input, args.output, args.manifest, modules)
+    except (OSError, ValueError) as e:
+        print(e)
         sys.exit(1)
 
     # solve
-    generator = support[args.language][args.module](args.input, args.output, args.data_name, args.window_name)
-    generator.generate()
+    create_generator = GeneratorFactory({module: get_generator_class(args.language, module) for module in modules},
+                                        data_name=args.data_name, window_name=args.window_name, parser=args.parser,
+                                        ir_cache=args.ir_cache and os.path.abspath(args.ir_cache), style=args.style,
+                                        pages=args.pages, hot_reload=args.hot_reload, stream=args.stream)
+    profiler = None
+    if args.profile:
+        import cProfile
+        # worker processes would be missed by the profiler
+        args.jobs = 1
+        profiler = cProfile.Profile()
+        profiler.enable()
+    results = []
+    if args.watch:
+        from watch import watch
+
+        def collect():
+            try:
+                return collect_jobs(args.input, args.output, args.manifest, modules)
+            except (OSError, ValueError) as e:
+                print(e)
+                return []
+        watch(collect, args.input, args.manifest, create_generator, args.force, cache, args.poll, args.debounce)
+    elif not batch:
+        results = run_jobs(jobs, create_generator, args.force, 1, cache, False)
+        # jobs of all modules share the input file, so an error of it is printed once
+        for error in dict.fromkeys(result.error for result in results if result.error is not None):
+            print(error)
+    else:
+        results = run_jobs(jobs, create_generator, args.force, args.jobs, cache)
+        print_report(results)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+    if args.timings == '-':
+        print_timings(results)
+    elif args.timings:
+        import json
+        with open(args.timings, 'w', encoding='utf-8') as f:
+            json.dump(get_timings(results), f, ensure_ascii=False, indent=2)
+    failed = any(result.error is not None for result in results)
+
+    # post-process outputs
+    generated = [result.job for result in results if result.error is None]
+    if args.byte_compile is not None and generated:
+        from outputs import byte_compile
+        errors = byte_compile(list(dict.fromkeys(job.output_file for job in generated)), optimization_levels, args.jobs)
+        for output_file, error in errors.items():
+            if error is not None:
+                print(f'[FAIL] byte-compile {output_file}: {error}')
+                failed = True
+    if (args.import_times or args.max_import_ms is not None) and generated:
+        from outputs import print_import_timings, time_import
+        import_timings = [time_import(job.output_file, create_generator(job).module_name, args.window_name)
+                          for job in generated]
+        if not print_import_timings(import_timings, args.max_import_ms):
+            failed = True
+    if failed:
+        sys.exit(1)
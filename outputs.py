@@ -0,0 +1,171 @@
+import importlib.util
+import json
+import os
+import py_compile
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+
+OPTIMIZATION_LEVELS = (0, 1, 2)  # levels of `python -O`, each has its own *.pyc
+
+# run in a subprocess by `time_import`: import Qt, then import the generated module and construct its window,
+# best of `repeat` runs is printed as json
+_TIMING_SCRIPT = '''
+import importlib, importlib.util, json, os, sys, time, types
+path, module_name, window_name, repeat = sys.argv[1:]
+
+
+def abspath(path_):
+    # absolute config paths are redirected into the working directory, where relative ones are already
+    if os.path.isabs(path_):
+        path_ = os.path.join('absolute', os.path.splitdrive(path_)[1].lstrip('\\\\/'))
+    return os.path.abspath(path_)
+
+
+# `os` of generated modules, which get config paths by `os.path.abspath`
+generated_os = types.SimpleNamespace(**vars(os))
+generated_os.path = types.SimpleNamespace(**vars(os.path))
+generated_os.path.abspath = abspath
+
+for name in ('QtWidgets', 'QtCore', 'QtGui'):
+    importlib.import_module(f'{module_name}.{name}')
+app = sys.modules[f'{module_name}.QtWidgets'].QApplication([])
+import_times, window_times = [], []
+for index in range(int(repeat)):
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(f'_generated_{index}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.os = generated_os
+    imported = time.perf_counter()
+    window = getattr(module, window_name)()
+    import_times.append(imported - start)
+    window_times.append(time.perf_counter() - imported)
+print(json.dumps({'import': min(import_times), 'window': min(window_times)}))
+'''
+
+
+class ImportTiming(NamedTuple):
+    """
+    import timing of a generated module, `error` is None if it succeeded, times are in seconds,
+    sizes are in bytes, `pyc_size` is None if it is not byte-compiled for the default optimization level
+    """
+    output_file: str
+    error: Optional[str]
+    import_time: float = 0.0
+    window_time: float = 0.0
+    size: int = 0
+    pyc_size: Optional[int] = None
+
+    @property
+    def total_time(self) -> float:
+        return self.import_time + self.window_time
+
+
+def byte_compile(output_files: Sequence[str], levels: Sequence[int],
+                 workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """
+    byte-compile output files over a process pool and return {output file: error or None}
+
+    :param levels: optimization levels to compile for, see `OPTIMIZATION_LEVELS`
+    :param workers: number of worker processes, `None` for cpu count, 1 to compile in current process
+    """
+    workers = min(workers or os.cpu_count() or 1, len(output_files) or 1)
+    if workers == 1:
+        errors = [compile_output(output_file, levels) for output_file in output_files]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            errors = list(executor.map(compile_output, output_files, [levels] * len(output_files)))
+    return dict(zip(output_files, errors))
+
+
+def compile_output(output_file: str, levels: Sequence[int]) -> Optional[str]:
+    """
+    byte-compile an output file for each optimization level unless its *.pyc is up to date,
+    never raises so that it is safe to run in a worker process
+
+    :return: error message, None if it succeeded
+    """
+    try:
+        for level in levels:
+            pyc_file = importlib.util.cache_from_source(output_file, optimization=level or '')
+            if not is_pyc_fresh(output_file, pyc_file):
+                py_compile.compile(output_file, pyc_file, doraise=True, optimize=level)
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'
+    return None
+
+
+def is_pyc_fresh(source_file: str, pyc_file: str) -> bool:
+    """
+    whether a *.pyc was compiled from the current source file, by the mtime and size in its header
+    """
+    try:
+        with open(pyc_file, 'rb') as f:
+            header = f.read(16)
+        stat = os.stat(source_file)
+    except OSError:
+        return False
+    return (len(header) == 16 and header[:4] == importlib.util.MAGIC_NUMBER
+            and int.from_bytes(header[4:8], 'little') == 0  # validated by timestamp, not by hash
+            and int.from_bytes(header[8:12], 'little') == int(stat.st_mtime) & 0xFFFFFFFF
+            and int.from_bytes(header[12:16], 'little') == stat.st_size & 0xFFFFFFFF)
+
+
+def time_import(output_file: str, module_name: str, window_name: str, repeat: int = 3,
+                timeout: float = 120) -> ImportTiming:
+    """
+    import a generated module and construct its window in a subprocess on the offscreen Qt platform,
+    and measure both without the import of Qt itself
+
+    The subprocess runs in a temporary directory, and config files are created there instead of their paths,
+    including absolute ones, which are redirected.
+
+    :param module_name: module name of GUI software, e.g. PyQt5
+    :param window_name: class name of ConfigWindow
+    :param repeat: times to import, best time is taken
+    """
+    size = os.path.getsize(output_file)
+    pyc_file = importlib.util.cache_from_source(output_file, optimization='')
+    pyc_size = os.path.getsize(pyc_file) if is_pyc_fresh(output_file, pyc_file) else None
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            process = subprocess.run(
+                [sys.executable, '-c', _TIMING_SCRIPT, output_file, module_name, window_name, str(repeat)],
+                cwd=directory, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return ImportTiming(output_file, f'timed out after {timeout:g} s', size=size, pyc_size=pyc_size)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines() or [f'exit code {process.returncode}']
+        return ImportTiming(output_file, lines[-1], size=size, pyc_size=pyc_size)
+    times = json.loads(process.stdout.strip().splitlines()[-1])
+    return ImportTiming(output_file, None, times['import'], times['window'], size, pyc_size)
+
+
+def print_import_timings(timings: List[ImportTiming], max_ms: Optional[float] = None) -> bool:
+    """
+    print import timing of each output and a summary line
+
+    :param max_ms: budget of import plus window construction in milliseconds, `None` for no budget
+    :return: True if all outputs were imported within the budget
+    """
+    slow = 0
+    for timing in timings:
+        if timing.error is not None:
+            print(f'[FAIL] {timing.output_file}: {timing.error}')
+            continue
+        status = ' OK '
+        if max_ms is not None and timing.total_time * 1000 > max_ms:
+            status = 'SLOW'
+            slow += 1
+        pyc = 'not compiled' if timing.pyc_size is None else f'{timing.pyc_size / 1024:.1f} KiB compiled'
+        print(f'[{status}] {timing.output_file}: import {timing.import_time * 1000:.1f} ms, '
+              f'window {timing.window_time * 1000:.1f} ms, {timing.size / 1024:.1f} KiB source, {pyc}')
+    failed = sum(timing.error is not None for timing in timings)
+    budget = '' if max_ms is None else f', {slow} over {max_ms:g} ms budget'
+    print(f'{len(timings) - failed} imported{budget}, {failed} failed')
+    return not failed and not slow
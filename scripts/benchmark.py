@@ -0,0 +1,243 @@
+"""
+benchmark of generation phases on synthetic specs
+
+    python scripts/benchmark.py --sizes 100,1000,5000 --save-baseline bench.json
+    python scripts/benchmark.py --sizes 100,1000,5000 --baseline bench.json --threshold 20
+    python scripts/benchmark.py --sizes 100000 --fieldsets 1000 --style compact --stream
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generator import PyQt5Generator  # noqa: E402
+from spec_parser import parse_spec, stream_spec  # noqa: E402
+
+
+def make_spec(fields: int, fieldsets: int = 0, nesting: int = 0, number_ratio: float = 0.5, seed: int = 0) -> str:
+    """
+    make a synthetic spec
+
+    :param fields: number of fields
+    :param fieldsets: number of fieldsets, fields are spread over them evenly, 0 to put all fields at top level
+    :param nesting: depth of <fieldset> nested in each fieldset, fields are spread over all levels
+    :param number_ratio: ratio of number fields, others are text fields
+    :param seed: seed of random choices
+    """
+    rnd = random.Random(seed)
+
+    def field(index: int) -> str:
+        if rnd.random() < number_ratio:
+            return (f'<p><span>Number {index}</span><input type="number" id="number_{index}" '
+                    f'value="{rnd.randint(0, 10)}" min="0" max="{rnd.randint(10, 1000)}"></p>')
+        return (f'<p><span>Text {index}</span><input type="text" id="text_{index}" placeholder="text {index}" '
+                f'value="value {index}" minlength="{rnd.choice((0, 1, 2))}" maxlength="32"></p>')
+
+    lines = [
+        '<!DOCTYPE html>',
+        '<html lang="en">',
+        '<head>',
+        '    <meta charset="UTF-8">',
+        f'    <title>Benchmark {fields}</title>',
+        '</head>',
+        '<body width="800" height="600" src="./res/config.json">',
+    ]
+    if fieldsets <= 0:
+        lines.extend(f'    {field(index)}' for index in range(fields))
+    else:
+        index = 0
+        for fieldset in range(fieldsets):
+            count = fields // fieldsets + (fieldset < fields % fieldsets)
+            levels = nesting + 1
+            lines.append(f'    <fieldset id="fieldset_{fieldset}"><legend>Fieldset {fieldset}</legend>')
+            for level in range(levels):
+                if level:
+                    lines.append(f'    <fieldset id="fieldset_{fieldset}_{level}"><legend>Level {level}</legend>')
+                for _ in range(count // levels + (level < count % levels)):
+                    lines.append(f'        {field(index)}')
+                    index += 1
+            lines.append('    </fieldset>' * levels)
+    lines.extend(['</body>', '</html>', ''])
+    return '\n'.join(lines)
+
+
+def get_phases(input_file: str, output_file: str, parser: str, style: str = 'classic',
+               stream: bool = False) -> List[Tuple[str, Callable]]:
+    """
+    get (name, function) of each phase of `PyQt5Generator`, each function takes and returns a state dict
+
+    :param stream: replace read, parse and sections by a single stream phase, as `PyQt5Generator` does when streaming
+    """
+    generator = PyQt5Generator(input_file, output_file, 'ConfigData', 'ConfigWindow', parser, style=style,
+                               stream=stream)
+    # private steps of the generator, accessed by their mangled names
+    get_sections = getattr(generator, '_PyQt5Generator__get_compact_sections' if style == 'compact' else
+                           '_PyQt5Generator__get_sections')
+    get_import_statement = getattr(generator, '_PyQt5Generator__get_import_statement')
+    get_data_class_statement = getattr(generator, '_PyQt5Generator__get_data_class_statement')
+    get_window_class_statement = getattr(generator, '_PyQt5Generator__get_window_class_statement')
+
+    def read(state):
+        with open(input_file, 'r', encoding='utf-8') as f:
+            state['text'] = f.read()
+
+    def parse(state):
+        state['spec'] = parse_spec(state['text'], parser)
+
+    def sections(state):
+        state['sections'] = get_sections(state['spec'], iter(state['spec'].content))
+
+    def stream_(state):
+        with open(input_file, 'r', encoding='utf-8') as f:
+            state['spec'], items = stream_spec(f)
+            state['sections'] = get_sections(state['spec'], items)
+
+    def import_statement(state):
+        state['code'] = list(get_import_statement())
+
+    def data_class_statement(state):
+        state['code'].extend(get_data_class_statement(state['spec'], state['sections']))
+
+    def window_class_statement(state):
+        state['code'].extend(get_window_class_statement(state['spec'], state['sections']))
+
+    def write(state):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.writelines(state['code'])
+
+    if stream:
+        first_phases = [('stream', stream_)]
+    else:
+        first_phases = [('read', read), ('parse', parse), ('sections', sections)]
+    return [
+        *first_phases,
+        ('import_statement', import_statement),
+        ('data_class_statement', data_class_statement),
+        ('window_class_statement', window_class_statement),
+        ('write', write),
+    ]
+
+
+def run_case(spec: str, parser: str, repeat: int, style: str = 'classic',
+             stream: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    run all phases on `spec` and return {phase: {'time': median seconds, 'peak': peak bytes}},
+    with an extra 'total' phase of all phases, whose peak includes memory kept from earlier phases
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'config.html')
+        output_file = os.path.join(directory, 'config.py')
+        with open(input_file, 'w', encoding='utf-8') as f:
+            f.write(spec)
+        phases = get_phases(input_file, output_file, parser, style, stream)
+
+        # time without tracemalloc, which slows allocation down
+        times: Dict[str, List[float]] = {name: [] for name, _ in phases}
+        for _ in range(repeat):
+            state = {}
+            for name, phase in phases:
+                start = time.perf_counter()
+                phase(state)
+                times[name].append(time.perf_counter() - start)
+
+        # peak memory allocated by each phase
+        peaks: Dict[str, float] = {}
+        state = {}
+        tracemalloc.start()
+        try:
+            total_peak = 0
+            for name, phase in phases:
+                current = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                phase(state)
+                peak = tracemalloc.get_traced_memory()[1]
+                peaks[name] = peak - current
+                total_peak = max(total_peak, peak)
+        finally:
+            tracemalloc.stop()
+
+    results = {name: {'time': statistics.median(times[name]), 'peak': peaks[name]} for name, _ in phases}
+    results['total'] = {'time': statistics.median(map(sum, zip(*times.values()))), 'peak': total_peak}
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_time: float, min_peak: float) -> List[str]:
+    """
+    compare results with baseline and return messages of regressions
+
+    :param threshold: allowed regression in percent
+    :param min_time: regressions of time smaller than this many seconds are ignored as noise
+    :param min_peak: regressions of peak memory smaller than this many bytes are ignored as noise
+    """
+    regressions = []
+    for case, phases in results.items():
+        for phase, result in phases.items():
+            base = baseline.get(case, {}).get(phase)
+            if base is None:
+                continue
+            for metric, slack in (('time', min_time), ('peak', min_peak)):
+                limit = base[metric] * (1 + threshold / 100)
+                if result[metric] > limit and result[metric] - base[metric] > slack:
+                    regressions.append(f'{case} {phase} {metric}: {format_metric(metric, result[metric])} > '
+                                       f'{format_metric(metric, base[metric])} + {threshold:g}%')
+    return regressions
+
+
+def format_metric(metric: str, value: float) -> str:
+    return f'{value * 1000:.2f} ms' if metric == 'time' else f'{value / 1024:.1f} KiB'
+
+
+def print_results(results: Dict):
+    for case, phases in results.items():
+        print(case)
+        for phase, result in phases.items():
+            print(f'  {phase:<24}{format_metric("time", result["time"]):>14}{format_metric("peak", result["peak"]):>16}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser('benchmark of generation phases on synthetic specs')
+    parser.add_argument('--sizes', type=str, default='100,1000,5000', help='comma separated field counts')
+    parser.add_argument('--fieldsets', type=int, default=10, help='number of fieldsets, 0 for top level fields only')
+    parser.add_argument('--nesting', type=int, default=0, help='depth of fieldsets nested in each fieldset')
+    parser.add_argument('--number-ratio', type=float, default=0.5, help='ratio of number fields')
+    parser.add_argument('-p', '--parser', type=str, default='fast', choices=['fast', 'bs4'], help='spec parser')
+    parser.add_argument('--style', type=str, default='classic', choices=['classic', 'compact'],
+                        help='style of generated code')
+    parser.add_argument('--stream', action='store_true', help='parse the spec in chunks while generating code')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='times to run each case, median is taken')
+    parser.add_argument('--save-baseline', type=str, help='save results as baseline json')
+    parser.add_argument('--baseline', type=str, help='baseline json to compare results with')
+    parser.add_argument('--threshold', type=float, default=20, help='allowed regression in percent')
+    parser.add_argument('--min-time', type=float, default=0.001, help='ignore time regressions below seconds')
+    parser.add_argument('--min-peak', type=float, default=64 * 1024, help='ignore memory regressions below bytes')
+    args = parser.parse_args()
+
+    results = {}
+    for size in (int(size) for size in args.sizes.split(',')):
+        case = f'fields={size},fieldsets={args.fieldsets},nesting={args.nesting},parser={args.parser}'
+        if args.style != 'classic' or args.stream:
+            case += f',style={args.style},stream={args.stream}'
+        spec = make_spec(size, args.fieldsets, args.nesting, args.number_ratio)
+        results[case] = run_case(spec, args.parser, args.repeat, args.style, args.stream)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'baseline saved to "{args.save_baseline}"')
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_time, args.min_peak)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print('no regression')
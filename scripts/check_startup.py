@@ -0,0 +1,60 @@
+"""
+check that CLI startup stays fast: commands which don't generate anything must not import generation modules
+
+    python scripts/check_startup.py --max-ms 50
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+# commands which only parse args, and modules they must not import
+COMMANDS = [
+    ['--version'],
+    ['--support'],
+    [],  # input file path is required
+    ['-i', 'config.html', '-o', 'config.py', '-m', 'unknown'],
+]
+FORBIDDEN = {
+    'bs4', 'generator', 'spec_parser', 'ir', 'batch', 'cache', 'watch', 'server', 'compiler', 'outputs',
+    'html.parser', 'http.server', 'concurrent.futures', 'multiprocessing', 'hashlib', 'json', 'cProfile',
+}
+
+
+def get_import_times(args: List[str]) -> Dict[str, int]:
+    """
+    run python with `-X importtime` and return {module: self import time in microseconds}
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_time)
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser('check imports and import time of CLI startup')
+    parser.add_argument('--max-ms', type=float, default=50,
+                        help='maximum import time in milliseconds on top of a bare interpreter')
+    args = parser.parse_args()
+
+    bare = get_import_times(['-c', 'pass'])
+    failed = False
+    for command in COMMANDS:
+        times = get_import_times([MAIN, *command])
+        extra = {name: time for name, time in times.items() if name not in bare}
+        total = sum(extra.values()) / 1000
+        forbidden = sorted(FORBIDDEN.intersection(extra))
+        status = 'FAIL' if forbidden or total > args.max_ms else ' OK '
+        failed = failed or status == 'FAIL'
+        print(f'[{status}] main.py {" ".join(command)}: {total:.1f} ms in {len(extra)} extra modules')
+        if forbidden:
+            print(f'       imported {", ".join(forbidden)}')
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,97 @@
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from api import generate_code
+
+
+class GenerateHandler(BaseHTTPRequestHandler):
+    """
+    handler of the generation server:
+
+    - `GET /health`: returns `ok`
+    - `POST /generate?language=Python3&module=PyQt5&data_name=ConfigData&window_name=ConfigWindow&parser=fast&style=classic&pages=tabs&hot_reload=1`
+      with spec text (utf-8) as body: returns generated code, or error message with status 400
+    """
+    OPTIONS = ('language', 'module', 'data_name', 'window_name', 'parser', 'style', 'pages', 'hot_reload')
+    FLAGS = ('hot_reload',)  # boolean options, true if `1`, `true` or `yes`
+    protocol_version = 'HTTP/1.1'  # keep connections alive for frequent calls
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self.__send(HTTPStatus.OK, 'ok')
+        else:
+            self.__send(HTTPStatus.NOT_FOUND, 'not found')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/generate':
+            self.__send(HTTPStatus.NOT_FOUND, 'not found')
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            # the body can't be read, so the connection can't be kept alive either
+            self.close_connection = True
+            self.__send(HTTPStatus.BAD_REQUEST, 'invalid Content-Length')
+            return
+        body = self.rfile.read(length)
+        try:
+            text = body.decode('utf-8')
+        except UnicodeDecodeError as e:
+            self.__send(HTTPStatus.BAD_REQUEST, f'body is not utf-8: {e}')
+            return
+        query = parse_qs(url.query)
+        unknown = set(query) - set(self.OPTIONS)
+        if unknown:
+            self.__send(HTTPStatus.BAD_REQUEST, f'unknown options: {", ".join(sorted(unknown))}')
+            return
+        options = {name: values[-1] for name, values in query.items()}
+        for name in self.FLAGS:
+            if name in options:
+                options[name] = options[name].lower() in ('1', 'true', 'yes')
+        try:
+            code = generate_code(text, **options)
+        except Exception as e:
+            self.__send(HTTPStatus.BAD_REQUEST, f'{type(e).__name__}: {e}')
+            return
+        self.__send(HTTPStatus.OK, code, 'text/x-python')
+
+    def log_message(self, format: str, *args):
+        pass  # called many times per second, keep quiet
+
+    def __send(self, status: HTTPStatus, text: str, content_type: str = 'text/plain'):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765):
+    """
+    serve generation over http until interrupted, generator classes and parser stay imported between calls
+    """
+    server = ThreadingHTTPServer((host, port), GenerateHandler)
+    print(f'serving on http://{host}:{server.server_port}, press Ctrl+C to stop')
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser('local server generating code for ConfigData and ConfigWindow')
+    parser.add_argument('--host', type=str, help='host to listen on', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='port to listen on', default=8765)
+    args = parser.parse_args()
+    serve(args.host, args.port)
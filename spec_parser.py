@@ -0,0 +1,407 @@
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from ir import Field, Fieldset, Item, NumberField, Spec, TextField
+
+
+def parse_spec(text: str, parser: str = 'fast') -> Spec:
+    """
+    parse spec text (*.html)
+
+    :param parser: 'fast' for `FastSpecParser`, 'bs4' for BeautifulSoup
+    """
+    if parser not in PARSERS:
+        raise ValueError(f'unsupported parser: {parser}')
+    return PARSERS[parser](text)
+
+
+def get_field(attrs: Dict[str, str], text: Optional[str]) -> Field:
+    """
+    get field of an input tag from its attributes and label text, shared by all parsers
+    """
+    text = None if text is None else str(text)  # may be a NavigableString of bs4
+    type_ = attrs.get('type', 'text')
+    id_ = attrs.get('id', '')
+    if not id_:
+        raise ValueError('id is required')
+    name = attrs.get('name', id_)
+
+    if type_ == 'text':
+        return TextField(id_, name, text,
+                         placeholder=attrs.get('placeholder', ''),
+                         value=attrs.get('value', ''),
+                         minlength=int(attrs.get('minlength', 0)),
+                         maxlength=int(attrs.get('maxlength', 10)))
+    elif type_ == 'number':
+        return NumberField(id_, name, text,
+                           value=int(attrs.get('value', 0)),
+                           min=int(attrs.get('min', 0)),
+                           max=int(attrs.get('max', 10)),
+                           step=int(attrs.get('step', 1)))
+    else:
+        raise Exception(f'unsupported input type: {type_}')
+
+
+def get_fieldset(attrs: Dict[str, str], text: Optional[str], fields: List[Field]) -> Fieldset:
+    """
+    get fieldset from its attributes, legend text and fields of its input tags, shared by all parsers
+    """
+    id_ = attrs.get('id', '')
+    if not id_:
+        raise ValueError('id is required')
+    return Fieldset(id_, None if text is None else str(text), fields)
+
+
+def parse_spec_with_bs4(text: str) -> Spec:
+    """
+    parse spec text by building a BeautifulSoup tree, slower but kept as reference of `FastSpecParser`
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(text, 'html.parser')
+    spec = Spec()
+
+    # html.lang
+    spec.lang = soup.html.get('lang', 'en')
+    # head.title
+    title = soup.head.title.string
+    spec.title = None if title is None else str(title)
+    # body.width, body.height, body.src
+    spec.width = int(soup.body.get('width', '800'))
+    spec.height = int(soup.body.get('height', '600'))
+    spec.config_path = soup.body.get('src', './res/config.json')
+    # all input tags or fieldset tags in body
+    for tag in soup.body.children:
+        if tag.name == 'p':  # input tag is wrapped in <p> tag with <span>
+            spec.content.append(get_input_tag_field_from(tag))
+        elif tag.name == 'fieldset':
+            spec.content.append(get_fieldset_tag_fieldset_from(tag))
+
+    return spec
+
+
+def get_input_tag_field_from(tag) -> Field:
+    """
+    get field from:
+
+    <p>
+        <span>label</span>
+        <input attr_name="attr_value" ...>
+    </p>
+    """
+    span_tag = tag.find('span')
+    input_tag = tag.find('input')
+    return get_field(input_tag.attrs, span_tag.string)
+
+
+def get_fieldset_tag_fieldset_from(tag) -> Fieldset:
+    """
+    get fieldset from:
+
+    <fieldset>
+        <legend>label</legend>
+        <p>input ...</p>
+        ...
+    </fieldset>
+    """
+    legend_tag = tag.find('legend')
+    p_tags = tag.find_all('p')
+    return get_fieldset(tag.attrs, legend_tag.string, [get_input_tag_field_from(p_tag) for p_tag in p_tags])
+
+
+class _Node:
+    """
+    children of a label element (<title>, <span>, <legend>), only kept while needed to get its `string`
+    """
+    __slots__ = ('children',)
+
+    def __init__(self):
+        self.children: List[Union[str, '_Node']] = []
+
+    @property
+    def string(self) -> Optional[str]:
+        """
+        same as `Tag.string` of BeautifulSoup: the only string child, or `string` of the only tag child
+        """
+        if len(self.children) != 1:
+            return None
+        child = self.children[0]
+        return child if isinstance(child, str) else child.string
+
+
+class _Record:
+    """
+    an open <p>, <fieldset> or <head> whose attributes and label are being collected
+    """
+    __slots__ = ('attrs', 'label', 'input', 'fields', 'index')
+
+    def __init__(self, attrs: Dict[str, str], fields: Optional[List[Field]] = None):
+        self.attrs = attrs
+        self.label: Optional[_Node] = None  # first <span>, <legend> or <title> inside
+        self.input: Optional[Dict[str, str]] = None  # attributes of first <input> inside, only used by <p>
+        self.fields = fields  # fields of <p> inside, only used by <fieldset>
+        self.index = -1  # index in `fields` of its <fieldset>, only used by <p> inside a <fieldset>
+
+
+class FastSpecParser(HTMLParser):
+    """
+    single pass, event-driven spec parser producing the same spec as BeautifulSoup without building a tree
+
+    Tokens come from `html.parser` as in BeautifulSoup, and the tree building rules of BeautifulSoup that matter
+    to the spec (void tags, implicit closing by end tags, whitespace collapsing, `Tag.string`) are followed.
+    Field of each <p> and fieldset of each <fieldset> are built as soon as they are closed.
+    """
+    VOID_TAGS = {
+        'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+        'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track',
+        'wbr',
+    }
+    PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+    ASCII_SPACES = ' \n\t\x0c\r'
+
+    def __init__(self, on_item: Optional[Callable[[Item], None]] = None):
+        """
+        :param on_item: called with field or fieldset of each top level <p> or <fieldset> once it is closed,
+                        they are collected into `spec.content` if not given
+        """
+        # same as BeautifulSoup, char refs are handled by `handle_charref` and `handle_entityref`
+        super().__init__(convert_charrefs=False)
+        self.spec = Spec()
+        self.__on_item = on_item if on_item is not None else self.__append_item
+        # open tags: [name, label node if inside a label element, record if it is a <p>, <fieldset> or <head>]
+        self.__stack: List[list] = []
+        self.__text: List[str] = []  # text not flushed yet
+        self.__preserve_whitespace = 0  # number of open <pre> and <textarea>
+        self.__html_seen = False
+        self.__head: Optional[_Record] = None
+        self.__head_done = False
+        self.__body: Optional[int] = None  # index of first <body> in stack while it is open
+        self.__body_seen = False
+        self.__fieldset: Optional[_Record] = None  # open top level <fieldset>
+        self.__inputs: List[_Record] = []  # open <p> which are top level or inside top level <fieldset>
+
+    def close(self):
+        super().close()
+        self.__flush()
+        while self.__stack:
+            self.__pop()
+        if not self.__html_seen:
+            raise ValueError('<html> is required')
+        if self.__head is None:
+            raise ValueError('<head> is required')
+        if not self.__body_seen:
+            raise ValueError('<body> is required')
+
+    def handle_starttag(self, tag: str, attrs: list):
+        self.__flush()
+        attr_dict = {key: '' if value is None else value for key, value in attrs}
+        node = None
+        record = None
+        parent = self.__stack[-1] if self.__stack else None
+
+        if parent is not None and parent[1] is not None:
+            # inside a label element, keep structure for `string`
+            node = _Node()
+            parent[1].children.append(node)
+        if tag == 'span':
+            node = self.__claim_label(self.__inputs, node)
+        elif tag == 'legend' and self.__fieldset is not None:
+            node = self.__claim_label([self.__fieldset], node)
+        elif tag == 'title' and self.__head is not None and not self.__head_done:
+            node = self.__claim_label([self.__head], node)
+
+        if tag == 'html' and not self.__html_seen:
+            self.__html_seen = True
+            self.spec.lang = attr_dict.get('lang', 'en')
+        elif tag == 'head' and self.__head is None:
+            record = self.__head = _Record(attr_dict)
+        elif tag == 'body' and not self.__body_seen:
+            self.__body_seen = True
+            self.spec.width = int(attr_dict.get('width', '800'))
+            self.spec.height = int(attr_dict.get('height', '600'))
+            self.spec.config_path = attr_dict.get('src', './res/config.json')
+            self.__body = len(self.__stack)
+        elif tag == 'input':
+            for record_ in self.__inputs:
+                if record_.input is None:
+                    record_.input = attr_dict
+        elif tag == 'p' and (self.__fieldset is not None or self.__is_body_child()):
+            record = _Record(attr_dict)
+            self.__inputs.append(record)
+            if self.__fieldset is not None:
+                # reserve its place, since nested <p> are closed before their parents
+                record.index = len(self.__fieldset.fields)
+                self.__fieldset.fields.append(None)
+        elif tag == 'fieldset' and self.__is_body_child():
+            record = self.__fieldset = _Record(attr_dict, [])
+
+        if tag in self.VOID_TAGS:
+            return
+        if tag in self.PRESERVE_WHITESPACE_TAGS:
+            self.__preserve_whitespace += 1
+        self.__stack.append([tag, node, record])
+
+    def handle_startendtag(self, tag: str, attrs: list):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        self.__flush()
+        if tag in self.VOID_TAGS:
+            return
+        # pop to the most recent open tag with the same name, ignore the end tag if there is none
+        for index in range(len(self.__stack) - 1, -1, -1):
+            if self.__stack[index][0] == tag:
+                while len(self.__stack) > index:
+                    self.__pop()
+                return
+
+    def handle_data(self, data: str):
+        self.__text.append(data)
+
+    def handle_charref(self, name: str):
+        self.__text.append(unescape_charref(name))
+
+    def handle_entityref(self, name: str):
+        self.__text.append(html5.get(name + ';', '&' + name))
+
+    def handle_comment(self, data: str):
+        self.__flush()
+        self.__text.append(data)
+        self.__flush()
+
+    def handle_decl(self, decl: str):
+        self.__flush()
+        self.__text.append(decl[len('DOCTYPE '):])
+        self.__flush()
+
+    def unknown_decl(self, data: str):
+        self.__flush()
+        self.__text.append(data[len('CDATA['):] if data.upper().startswith('CDATA[') else data)
+        self.__flush()
+
+    def handle_pi(self, data: str):
+        self.__flush()
+        self.__text.append(data)
+        self.__flush()
+
+    def __append_item(self, item: Item):
+        self.spec.content.append(item)
+
+    def __is_body_child(self) -> bool:
+        return self.__body is not None and len(self.__stack) == self.__body + 1
+
+    @staticmethod
+    def __claim_label(records: List[_Record], node: Optional[_Node]) -> Optional[_Node]:
+        """
+        use `node`, or a new node if it is None, as label of records without a label yet
+        """
+        records = [record for record in records if record.label is None]
+        if records and node is None:
+            node = _Node()
+        for record in records:
+            record.label = node
+        return node
+
+    def __flush(self):
+        """
+        turn text collected so far into a string, in the same way as `BeautifulSoup.endData`
+        """
+        if not self.__text:
+            return
+        text = ''.join(self.__text)
+        self.__text.clear()
+        if not self.__preserve_whitespace and not text.strip(self.ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        if self.__stack and self.__stack[-1][1] is not None:
+            self.__stack[-1][1].children.append(text)
+
+    def __pop(self):
+        tag, _, record = self.__stack.pop()
+        if tag in self.PRESERVE_WHITESPACE_TAGS:
+            self.__preserve_whitespace -= 1
+        if tag == 'body' and self.__body == len(self.__stack):
+            self.__body = None
+        if record is None:
+            return
+        if record is self.__head:
+            self.__head_done = True
+            if record.label is None:
+                raise ValueError('<title> is required in <head>')
+            self.spec.title = record.label.string
+        elif record is self.__fieldset:
+            self.__fieldset = None
+            if record.label is None:
+                raise ValueError('<legend> is required in <fieldset>')
+            self.__on_item(get_fieldset(record.attrs, record.label.string, record.fields))
+        else:
+            self.__inputs.remove(record)
+            if record.label is None:
+                raise ValueError('<span> is required in <p>')
+            if record.input is None:
+                raise ValueError('<input> is required in <p>')
+            field = get_field(record.input, record.label.string)
+            if record.index >= 0:
+                self.__fieldset.fields[record.index] = field
+            else:
+                self.__on_item(field)
+
+
+def unescape_charref(name: str) -> str:
+    """
+    convert a numeric char ref to text like BeautifulSoup, invalid code points become U+FFFD
+    """
+    number = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+    if 128 <= number <= 159:
+        # windows-1252 characters are often used by mistake
+        return bytes([number]).decode('windows-1252', 'replace')
+    try:
+        return chr(number)
+    except (ValueError, OverflowError):
+        return '�'
+
+
+def parse_spec_fast(text: str) -> Spec:
+    """
+    parse spec text by `FastSpecParser`
+    """
+    parser = FastSpecParser()
+    parser.feed(text)
+    parser.close()
+    return parser.spec
+
+
+def stream_spec(f: TextIO, chunk_size: int = 1 << 16) -> Tuple[Spec, Iterator[Item]]:
+    """
+    parse spec from a file in chunks by `FastSpecParser`, so that neither the whole text nor all items are kept
+
+    :param f: spec file opened in text mode
+    :param chunk_size: characters read at a time
+    :return: spec without content, and an iterator of items of its content, which are parsed while iterating.
+             Attributes of spec are set when their tags are parsed, which is before the first item in valid specs,
+             and checked after the last item.
+    """
+    items: List[Item] = []  # items closed in the current chunk
+    parser = FastSpecParser(items.append)
+
+    def iter_items() -> Iterator[Item]:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from items
+            items.clear()
+        parser.close()
+        yield from items
+        items.clear()
+
+    return parser.spec, iter_items()
+
+
+PARSERS: Dict[str, Callable[[str], Spec]] = {
+    'fast': parse_spec_fast,
+    'bs4': parse_spec_with_bs4,
+}
@@ -0,0 +1,226 @@
+import ctypes
+import ctypes.util
+import glob
+import os
+import select
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from batch import Job, print_report, run_jobs
+from cache import BuildCache, hash_file
+from generator import BaseGenerator
+
+
+Signature = Tuple[int, int]  # (mtime_ns, size)
+
+
+def get_signature(path: str) -> Optional[Signature]:
+    """
+    get (mtime_ns, size) of a file, None if it doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Watcher:
+    """
+    base class for watchers, which only tell whether something may have changed
+    """
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        block until something changes or `timeout` seconds passed
+
+        :return: True if something changed
+        """
+        raise NotImplementedError()
+
+    def update(self, directories: Iterable[str]):
+        """
+        update watched directories, called after every round since new directories may appear
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class PollingWatcher(Watcher):
+    """
+    watcher comparing snapshots of file signatures every `interval` seconds
+    """
+    def __init__(self, snapshot: Callable[[], Dict[str, Optional[Signature]]], interval: float = 0.5):
+        """
+        :param snapshot: function returning signatures of watched files
+        :param interval: seconds between two snapshots
+        """
+        self.snapshot = snapshot
+        self.interval = interval
+        self.__last = snapshot()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if delay > 0:
+                time.sleep(delay)
+            current = self.snapshot()
+            if current != self.__last:
+                self.__last = current
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+
+class InotifyWatcher(Watcher):
+    """
+    watcher based on linux inotify, called through libc so that no extra package is needed
+    """
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directories: Iterable[str]):
+        """
+        :param directories: directories to watch, files are watched through their directory because
+                            many editors save by replacing the file
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on linux')
+        self.__libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.__fd = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.__directories: Set[str] = set()
+        self.update(directories)
+
+    def update(self, directories: Iterable[str]):
+        for directory in set(directories) - self.__directories:
+            if self.__libc.inotify_add_watch(self.__fd, os.fsencode(directory), self.MASK) >= 0:
+                self.__directories.add(directory)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        if not select.select([self.__fd], [], [], timeout)[0]:
+            return False
+        # events are not parsed, changed files are found by comparing signatures
+        try:
+            while os.read(self.__fd, 1 << 16):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.__fd)
+
+
+def get_watch_directories(inputs: List[str], manifest: Optional[str], jobs: List[Job]) -> Set[str]:
+    """
+    get directories to watch: directories of input files, input directories with their subdirectories,
+    base directories of glob patterns and directory of manifest
+    """
+    directories = {os.path.dirname(job.input_file) for job in jobs}
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            directories.update(os.path.abspath(directory) for directory, _, _ in os.walk(pattern))
+        elif glob.has_magic(pattern):
+            base = pattern
+            while glob.has_magic(base):
+                base = os.path.dirname(base)
+            if os.path.isdir(base or '.'):
+                directories.add(os.path.abspath(base or '.'))
+    if manifest:
+        directories.add(os.path.dirname(os.path.abspath(manifest)))
+    return directories
+
+
+def create_watcher(directories: Iterable[str], snapshot: Callable[[], Dict[str, Optional[Signature]]],
+                   polling: bool = False) -> Watcher:
+    """
+    create an inotify watcher if available, otherwise a polling watcher
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(snapshot)
+
+
+def watch(collect: Callable[[], List[Job]], inputs: List[str], manifest: Optional[str],
+          create_generator: Callable[[Job], BaseGenerator], force: bool,
+          cache: Optional[BuildCache] = None, polling: bool = False, debounce: float = 0.2):
+    """
+    generate all jobs, then stay resident and regenerate jobs whose input changed until interrupted
+
+    Generation runs in the current process, so generator modules and parser stay imported.
+    Input files are only hashed again when their signature changes, and regenerated only when content changes.
+
+    :param collect: function returning current jobs, called after every change so that new input files are found
+    :param create_generator: see `batch.run_group`
+    :param inputs: input args, see `get_watch_directories`
+    :param manifest: manifest arg, see `get_watch_directories`
+    :param debounce: seconds without any change to wait before regenerating, to merge bursts of editor saves
+    """
+    jobs = collect()
+    # input file -> (signature, content hash) of the last generation
+    state: Dict[str, Tuple[Optional[Signature], Optional[str]]] = {}
+    generated: Set[str] = set()  # output files written by this session, always overwritable
+
+    def run(jobs_: List[Job]):
+        if not jobs_:
+            return
+        results = []
+        for force_, jobs__ in ((True, [job for job in jobs_ if job.output_file in generated]),
+                               (force, [job for job in jobs_ if job.output_file not in generated])):
+            if jobs__:
+                results.extend(run_jobs(jobs__, create_generator, force_, 1, cache))
+        for result in results:
+            if result.error is None:
+                generated.add(result.job.output_file)
+        print(time.strftime('[%H:%M:%S]'))
+        print_report(results)
+        sys.stdout.flush()
+
+    def changed(jobs_: List[Job]) -> List[Job]:
+        inputs: Dict[str, bool] = {}  # input file -> whether it changed, checked once for jobs of all modules
+        for input_file in dict.fromkeys(job.input_file for job in jobs_):
+            signature = get_signature(input_file)
+            last_signature, last_hash = state.get(input_file, (None, None))
+            if signature is not None and signature == last_signature:
+                inputs[input_file] = False
+                continue
+            try:
+                content_hash = hash_file(input_file)
+            except OSError:
+                content_hash = None
+            state[input_file] = (signature, content_hash)
+            inputs[input_file] = content_hash is None or content_hash != last_hash
+        return [job for job in jobs_ if inputs[job.input_file]]
+
+    def snapshot() -> Dict[str, Optional[Signature]]:
+        return {job.input_file: get_signature(job.input_file) for job in collect()}
+
+    run(changed(jobs))
+    watcher = create_watcher(get_watch_directories(inputs, manifest, jobs), snapshot, polling)
+    print(f'watching {len({job.input_file for job in jobs})} input files with {type(watcher).__name__}, press Ctrl+C to stop')
+    try:
+        while True:
+            if not watcher.wait(None):
+                continue
+            while watcher.wait(debounce):
+                pass
+            jobs = collect()
+            watcher.update(get_watch_directories(inputs, manifest, jobs))
+            run(changed(jobs))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()